@@ -0,0 +1,264 @@
+import argparse
+import datetime
+import email.utils
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import catalog
+import export
+import metrics
+import session_memory
+import session_store
+import tools
+
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("API_PORT", "8502") or 0)
+# The API's address as browsers reach it. Unset, the UI cannot link to it and
+# hides the bulk-export download.
+PUBLIC_URL = os.environ.get("API_PUBLIC_URL", "").rstrip("/")
+# Only when set to 1 do requests without X-Gemini-Api-Key spend the server's GEMINI_API_KEY.
+API_ALLOW_SERVER_KEY = os.environ.get("API_ALLOW_SERVER_KEY", "") == "1"
+CATALOG_MTIME = datetime.datetime.fromtimestamp(
+    os.path.getmtime(catalog.__file__), tz=datetime.timezone.utc
+).replace(microsecond=0)
+
+
+def _seconds_until_midnight(now):
+    tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), now.tzinfo)
+    return int((tomorrow - now).total_seconds())
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    """JSON endpoints for the daily prompts, the prompt catalog and tool invocation.
+
+    GET  /api/daily?difficulty=All   today's prompt set (ETag/Last-Modified, cached until midnight)
+    GET  /api/prompts                the full prompt catalog and themes
+    GET  /api/tools                  registered tools and the fields each one takes
+    GET  /api/export?token=...       stream a session's history, gallery and generations (zip or jsonl)
+    GET  /api/memory?top=10          sessions in this process holding the most session-state memory
+    GET  /metrics                    latency histograms, error counts and active sessions (Prometheus text)
+    POST /api/tools/<tool_id>        run a tool; JSON body of fields, key in X-Gemini-Api-Key
+    """
+
+    server_version = "PromptHubAPI/1.0"
+
+    # --- Responses ---
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_cacheable(self, payload, last_modified, max_age):
+        # HTTP dates are GMT; format_datetime(usegmt=True) rejects any other zone.
+        last_modified = last_modified.astimezone(datetime.timezone.utc)
+        body = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": email.utils.format_datetime(last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={max_age}",
+        }
+        if self._not_modified(etag, last_modified):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self._send_json(200, payload, headers)
+
+    def _not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return last_modified <= email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    # --- Routes ---
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/api/daily":
+            self._daily(query.get("difficulty", ["All"])[0])
+        elif url.path == "/api/prompts":
+            self._send_cacheable(
+                {"themes": catalog.THEMES, "difficulties": catalog.DIFFICULTIES, "prompts": catalog.PROMPTS},
+                CATALOG_MTIME,
+                3600,
+            )
+        elif url.path == "/api/tools":
+            self._send_cacheable(
+                {
+                    tool_id: {"label": tool["label"], "fields": tools.tool_fields(tool_id), "shared": bool(tool.get("shared"))}
+                    for tool_id, tool in tools.TOOLS.items()
+                },
+                CATALOG_MTIME,
+                3600,
+            )
+        elif url.path == "/api/export":
+            self._export(query)
+        elif url.path == "/api/memory":
+            self._memory(query.get("top", ["10"])[0])
+        elif url.path == "/metrics":
+            self._metrics()
+        elif url.path == "/healthz":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if not url.path.startswith("/api/tools/"):
+            self._send_json(404, {"error": "Not found"})
+            return
+        tool_id = url.path[len("/api/tools/"):]
+        if tool_id not in tools.TOOLS:
+            self._send_json(404, {"error": f"Unknown tool: {tool_id}"})
+            return
+        api_key = self.headers.get("X-Gemini-Api-Key")
+        if not api_key and API_ALLOW_SERVER_KEY:
+            api_key = os.environ.get("GEMINI_API_KEY")
+        if not api_key:
+            self._send_json(401, {"error": "An X-Gemini-Api-Key header is required."})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            fields = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(fields, dict):
+                raise ValueError("The request body must be a JSON object of tool fields.")
+            unknown = sorted(set(fields) - set(tools.tool_fields(tool_id)))
+            if unknown:
+                raise ValueError(f"Unknown fields for {tool_id}: {', '.join(unknown)}")
+            result = tools.run_tool(api_key, tool_id, **fields)
+        except tools.RateLimitError as e:
+            metrics.record_tool_failure("api", tool_id, e)
+            self._send_json(429, {"error": str(e)}, {"Retry-After": str(int(e.retry_after) + 1)})
+        except ValueError as e:
+            metrics.record_tool_failure("api", tool_id, e)
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            metrics.record_tool_failure("api", tool_id, e)
+            self._send_json(502, {"error": f"An error occurred: {e}"})
+        else:
+            self._send_json(200, {"tool": tool_id, "result": result})
+
+    def _daily(self, difficulty):
+        if difficulty not in catalog.DIFFICULTIES:
+            self._send_json(400, {"error": f"difficulty must be one of {', '.join(catalog.DIFFICULTIES)}"})
+            return
+        now = datetime.datetime.now().astimezone()
+        today = now.date()
+        midnight = datetime.datetime.combine(today, datetime.time(), now.tzinfo)
+        self._send_cacheable(
+            {
+                "date": today.isoformat(),
+                "theme": catalog.weekly_theme(today),
+                "difficulty": difficulty,
+                "prompts": catalog.daily_prompts(today, difficulty),
+            },
+            max(midnight, CATALOG_MTIME),
+            _seconds_until_midnight(now),
+        )
+
+    def _memory(self, top):
+        if not top.isdigit() or int(top) < 1:
+            self._send_json(400, {"error": "top must be a positive integer"})
+            return
+        self._send_json(200, {"top_consumers": session_memory.top_consumers(int(top))})
+
+    def _metrics(self):
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _export(self, query):
+        token = query.get("token", [""])[0]
+        sid = query.get("sid", [""])[0]
+        fmt = query.get("format", ["zip"])[0]
+        if token:
+            sid = _export_stores()[1].redeem_token(token)
+            if sid is None:
+                self._send_json(403, {"error": "This download link has expired; create a new one in the app."})
+                return
+        if not sid:
+            self._send_json(400, {"error": "A token or sid is required."})
+            return
+        if fmt not in export.EXPORT_FORMATS:
+            self._send_json(400, {"error": f"format must be one of {', '.join(export.EXPORT_FORMATS)}"})
+            return
+        incremental = query.get("since", [""])[0] == "last"
+        stamp = datetime.date.today().isoformat()
+        # No Content-Length: the archive is produced while it is sent and the
+        # end of the body is marked by closing the connection.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip" if fmt == "zip" else "application/jsonl")
+        self.send_header("Content-Disposition", f'attachment; filename="prompt-hub-export-{stamp}.{fmt}"')
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        if self.command == "HEAD":
+            return
+        store, generations = _export_stores()
+        for chunk in export.stream_export(sid, store, generations, fmt, incremental):
+            if chunk:
+                self.wfile.write(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_stores = None
+_stores_lock = threading.Lock()
+
+
+def _export_stores():
+    global _stores
+    with _stores_lock:
+        if _stores is None:
+            _stores = (session_store.open_store(), export.GenerationStore())
+        return _stores
+
+
+def start_background(host=API_HOST, port=API_PORT):
+    """Serve the API from a daemon thread; returns None if the port is already taken."""
+    try:
+        server = ThreadingHTTPServer((host, port), APIHandler)
+    except OSError:
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="prompt-hub-api", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Prompt Hub JSON API.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT or 8502)
+    args = parser.parse_args(argv)
+    server = ThreadingHTTPServer((args.host, args.port), APIHandler)
+    print(f"Serving Prompt Hub API on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+import tools
+
+BATCH_DIR = os.environ.get("BATCH_DIR", "batch_outputs")
+
+
+def read_inputs(fp, fmt):
+    """Yield one dict of tool fields per CSV row or JSONL line."""
+    if fmt == "csv":
+        yield from csv.DictReader(fp)
+    elif fmt == "jsonl":
+        for line in fp:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported batch input format: {fmt}")
+
+
+def input_format(filename):
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def completed_indices(output_path):
+    """Indices that already have a result in `output_path`, so a rerun can skip them."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as out:
+        for line in out:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short by an interrupted run is simply redone.
+            if "result" in record:
+                done.add(record["index"])
+    return done
+
+
+def tool_inputs(tool_id, row):
+    """The tool's own fields from an input row, like the API's JSON body.
+
+    Extra CSV columns, or keys such as "images" or "api_key", never reach
+    run_tool. A row that is not an object is a permanent input error.
+    """
+    if not isinstance(row, dict):
+        raise ValueError(f"Each input must be an object of tool fields, not {type(row).__name__}.")
+    return {name: row[name] for name in tools.tool_fields(tool_id) if row.get(name) is not None}
+
+
+def _run_with_retries(api_key, tool_id, fields, retries, backoff):
+    fields = tool_inputs(tool_id, fields)
+    attempt = 0
+    while True:
+        try:
+            return tools.run_tool(api_key, tool_id, **fields)
+        except tools.RateLimitError as e:
+            time.sleep(e.retry_after)  # Waiting for our own limiter is not a failed attempt.
+        except ValueError:
+            raise
+        except Exception:
+            attempt += 1
+            if attempt > retries:
+                raise
+            time.sleep(backoff * 2 ** (attempt - 1) * (1 + random.random()))
+
+
+def run_batch(api_key, tool_id, rows, output_path, concurrency=4, retries=3, backoff=1.0, progress=None):
+    """Run `tool_id` over `rows`, appending one JSON line per item to `output_path`.
+
+    Items already completed in `output_path` are skipped, so an interrupted run
+    resumes where it stopped. At most `concurrency` requests are in flight and
+    only that many rows are read ahead of the results. `progress(done, failed)`
+    is called from the calling thread after every item.
+    """
+    if tool_id not in tools.TOOLS:
+        raise KeyError(f"Unknown tool: {tool_id}")
+    done = completed_indices(output_path)
+    summary = {"completed": 0, "failed": 0, "skipped": 0}
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = {}
+
+        def drain(return_when):
+            finished, _ = concurrent.futures.wait(pending, return_when=return_when)
+            for future in finished:
+                index, fields = pending.pop(future)
+                record = {"index": index, "input": fields}
+                try:
+                    record["result"] = future.result()
+                    summary["completed"] += 1
+                except Exception as e:
+                    record["error"] = f"{type(e).__name__}: {e}"
+                    summary["failed"] += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                if progress:
+                    progress(summary["completed"] + summary["skipped"], summary["failed"])
+
+        for index, fields in enumerate(rows):
+            if index in done:
+                summary["skipped"] += 1
+                continue
+            future = pool.submit(_run_with_retries, api_key, tool_id, fields, retries, backoff)
+            pending[future] = (index, fields)
+            if len(pending) >= concurrency:
+                drain(concurrent.futures.FIRST_COMPLETED)
+        if pending:
+            drain(concurrent.futures.ALL_COMPLETED)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Prompt Hub tool over a CSV/JSONL file of inputs.")
+    parser.add_argument("tool", choices=sorted(tools.TOOLS))
+    parser.add_argument("input", help="CSV with a header row, or JSONL; columns/keys are the tool's fields")
+    parser.add_argument("output", help="JSONL results file; rerun with the same path to resume")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        parser.error("Set GEMINI_API_KEY to run a batch.")
+
+    def report(done, failed):
+        print(f"\r{done} done, {failed} failed", end="", file=sys.stderr)
+
+    with open(args.input, newline="", encoding="utf-8-sig") as fp:
+        rows = read_inputs(fp, input_format(args.input))
+        summary = run_batch(api_key, args.tool, rows, args.output, args.concurrency, args.retries, progress=report)
+    print(file=sys.stderr)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import fake_gemini
+
+# The suite always runs offline against the fake backends and throwaway stores.
+fake_gemini.offline_environment()
+
+from PIL import Image
+
+import catalog
+import session_memory
+import tools
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+BENCH_DIR = os.environ.get("BENCH_DIR", ".benchmarks")
+
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=50):
+    """Register a benchmark. The decorated function does its setup and returns the callable to time."""
+    def register(fn):
+        BENCHMARKS[name] = (fn, repeat)
+        return fn
+    return register
+
+
+# --- Fixtures ---
+def _png_bytes(width=1024, height=768):
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), (40, 90, 160)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _large_session(blobs):
+    history = {}
+    start = datetime.date.today() - datetime.timedelta(days=29)
+    for offset in range(30):
+        day = start + datetime.timedelta(days=offset)
+        history[str(day)] = [p for prompts in catalog.PROMPTS.values() for p in prompts]
+    image = _png_bytes(256, 256)
+    gallery = [session_memory.gallery_item(f"Work {i} " * 20, f"Feedback {i} " * 40, image, blobs) for i in range(100)]
+    return {"prompt_history": history, "gallery": gallery, "story": [f"Part {i} of the story." * 5 for i in range(200)]}
+
+
+def _app_test():
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(APP_PATH, default_timeout=60)
+
+
+# --- Benchmarks ---
+@benchmark("prompt_selection", repeat=200)
+def bench_prompt_selection():
+    days = [datetime.date(2026, 1, 1) + datetime.timedelta(days=i) for i in range(30)]
+
+    def run():
+        for day in days:
+            for difficulty in catalog.DIFFICULTIES:
+                catalog.daily_prompts(day, difficulty)
+    return run
+
+
+@benchmark("tool_dispatch_miss", repeat=200)
+def bench_tool_dispatch_miss():
+    tools.rate_limiter = tools.RateLimiter(10 ** 9)
+    counter = iter(range(10 ** 9))
+
+    def run():
+        tools.run_tool("bench", "eli5", topic=f"topic {next(counter)}")
+    return run
+
+
+@benchmark("tool_dispatch_hit", repeat=500)
+def bench_tool_dispatch_hit():
+    tools.rate_limiter = tools.RateLimiter(10 ** 9)
+    tools.run_tool("bench", "eli5", topic="cached topic")
+
+    def run():
+        tools.run_tool("bench", "eli5", topic="cached topic")
+    return run
+
+
+@benchmark("image_upload", repeat=30)
+def bench_image_upload():
+    data = _png_bytes()
+    blobs = session_memory.BlobStore()
+
+    def run():
+        Image.open(io.BytesIO(data)).load()
+        session_memory.gallery_item("work", "feedback", data, blobs)
+    return run
+
+
+@benchmark("memory_accounting", repeat=50)
+def bench_memory_accounting():
+    state = _large_session(session_memory.BlobStore())
+
+    def run():
+        session_memory.enforce_caps(state)
+        session_memory.memory_report(state)
+    return run
+
+
+@benchmark("rerun_script", repeat=20)
+def bench_rerun_script():
+    at = _app_test()
+    at.run()
+
+    def run():
+        at.run()
+    return run
+
+
+@benchmark("rerun_large_history_gallery", repeat=20)
+def bench_rerun_large_history_gallery():
+    at = _app_test()
+    at.run()
+    for key, value in _large_session(session_memory.BlobStore()).items():
+        at.session_state[key] = value
+
+    def run():
+        at.run()
+    return run
+
+
+# --- Runner ---
+def run_benchmarks(names=None, repeat_scale=1.0):
+    results = {}
+    for name, (fn, repeat) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        target = fn()
+        target()  # Warm-up: imports, caches, first script compile.
+        samples = []
+        for _ in range(max(1, int(repeat * repeat_scale))):
+            started = time.perf_counter()
+            target()
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        results[name] = {
+            "runs": len(samples),
+            "min_ms": samples[0],
+            "median_ms": statistics.median(samples),
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "mean_ms": statistics.fmean(samples),
+        }
+        print(f"{name:<30} median {results[name]['median_ms']:9.3f} ms   p95 {results[name]['p95_ms']:9.3f} ms", flush=True)
+    return results
+
+
+def _default_label():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def compare(current, baseline, threshold):
+    """Print median changes against a baseline and return the benchmarks that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<30} {'baseline':>11} {'current':>11} {'change':>8}")
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], result["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<30} {before:9.3f}ms {after:9.3f}ms {change:+7.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for the Prompt Hub hot paths.")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--label", default=None, help="Name to store results under (default: git short hash)")
+    parser.add_argument("--compare", metavar="LABEL", help="Compare against previously stored results")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Median slowdown counted as a regression")
+    parser.add_argument("--quick", action="store_true", help="Run a tenth of the usual iterations")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.names, 0.1 if args.quick else 1.0)
+    label = args.label or _default_label()
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    with open(os.path.join(BENCH_DIR, f"{label}.json"), "w", encoding="utf-8") as out:
+        json.dump({
+            "label": label,
+            "recorded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, out, indent=2)
+
+    if args.compare:
+        with open(os.path.join(BENCH_DIR, f"{args.compare}.json"), encoding="utf-8") as fp:
+            baseline = json.load(fp)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
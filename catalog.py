@@ -0,0 +1,62 @@
+import random
+
+# --- Themed Weeks ---
+THEMES = {
+    1: "Sci-Fi Future", 2: "Fantasy Realms", 3: "Mystery & Detective", 4: "Cyberpunk City"
+}
+
+# --- Prompts ---
+PROMPTS = { # Expanded prompts for themes
+    "✍️ Writing": [
+        {"prompt": "An android discovers it can dream.", "level": "Easy", "theme": "Sci-Fi Future"},
+        {"prompt": "A dragon's last egg is stolen.", "level": "Medium", "theme": "Fantasy Realms"},
+        {"prompt": "A detective finds a strange symbol at a crime scene.", "level": "Hard", "theme": "Mystery & Detective"},
+    ],
+    "🎨 Drawing": [
+        {"prompt": "A bustling alien marketplace.", "level": "Easy", "theme": "Sci-Fi Future"},
+        {"prompt": "An enchanted forest with glowing flora.", "level": "Medium", "theme": "Fantasy Realms"},
+        {"prompt": "A noir-style city in perpetual rain.", "level": "Hard", "theme": "Mystery & Detective"},
+    ],
+    "💻 Coding": [
+        {"prompt": "A script to simulate a starship's dashboard.", "level": "Easy", "theme": "Sci-Fi Future"},
+        {"prompt": "A fantasy RPG character generator.", "level": "Medium", "theme": "Fantasy Realms"},
+        {"prompt": "A program to decode secret messages.", "level": "Hard", "theme": "Mystery & Detective"},
+    ],
+}
+
+DIFFICULTIES = ["All", "Easy", "Medium", "Hard"]
+
+
+def weekly_theme(date):
+    week_of_year = date.isocalendar()[1]
+    return THEMES.get(week_of_year % len(THEMES) + 1, "General")
+
+
+def daily_prompts(date, difficulty="All"):
+    """Pick one prompt per category for `date`.
+
+    The choice is seeded by the date, so every rerun, replica and API client
+    sees the same set for the whole day. Categories with no prompt at the
+    requested difficulty map to None.
+    """
+    selection = {}
+    for category, prompt_list in PROMPTS.items():
+        filtered_prompts = [p for p in prompt_list if difficulty == "All" or p["level"] == difficulty]
+        rng = random.Random(f"{date.isoformat()}:{category}:{difficulty}")
+        selection[category] = rng.choice(filtered_prompts) if filtered_prompts else None
+    return selection
+
+
+def theme_seeds(theme):
+    """Inputs for the theme-aware tools, most useful first.
+
+    The first seed of each tool is what the UI pre-fills, so it is the one the
+    warm-up scheduler generates before anything else.
+    """
+    ideas = [p["prompt"] for prompts in PROMPTS.values() for p in prompts if p["theme"] == theme]
+    categories = [category.split(" ", 1)[-1] for category in PROMPTS]
+    return {
+        "personalized_prompt": [{"topic": theme}] + [{"topic": f"{theme} ({category})"} for category in categories],
+        "idea_expander": [{"idea": idea} for idea in ideas] or [{"idea": theme}],
+        "world_anvil": [{"concept": theme}] + [{"concept": idea} for idea in ideas],
+    }
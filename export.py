@@ -0,0 +1,235 @@
+import argparse
+import base64
+import datetime
+import io
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zipfile
+
+import session_memory
+import session_store
+
+GENERATIONS_DB = os.environ.get("GENERATIONS_DB", "generations.db")
+EXPORT_TOKEN_TTL_SECONDS = int(os.environ.get("EXPORT_TOKEN_TTL_SECONDS", "900"))
+EXPORT_FORMATS = ("zip", "jsonl")
+
+
+# --- Saved Generations ---
+class GenerationStore:
+    """Append-only log of tool results per session, plus each session's export cursor."""
+
+    def __init__(self, path=GENERATIONS_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS generations ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, sid TEXT NOT NULL, created_at REAL NOT NULL, "
+            "tool TEXT NOT NULL, fields TEXT NOT NULL, result TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_generations_sid ON generations (sid, id);"
+            "CREATE TABLE IF NOT EXISTS export_cursors (sid TEXT PRIMARY KEY, cursor TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS export_tokens (token TEXT PRIMARY KEY, sid TEXT NOT NULL, expires_at REAL NOT NULL);"
+        )
+
+    def save(self, sid, tool, fields, result):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO generations (sid, created_at, tool, fields, result) VALUES (?, ?, ?, ?, ?)",
+                (sid, time.time(), tool, json.dumps(fields, ensure_ascii=False, default=str), result),
+            )
+
+    def iter_since(self, sid, after_id=0, page_size=200):
+        """Yield the session's generations with id > after_id, one page of rows at a time."""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, created_at, tool, fields, result FROM generations "
+                    "WHERE sid = ? AND id > ? ORDER BY id LIMIT ?",
+                    (sid, after_id, page_size),
+                ).fetchall()
+            for row_id, created_at, tool, fields, result in rows:
+                yield {
+                    "id": row_id,
+                    "created_at": datetime.datetime.fromtimestamp(created_at, datetime.timezone.utc).isoformat(),
+                    "tool": tool,
+                    "fields": json.loads(fields),
+                    "result": result,
+                }
+            if len(rows) < page_size:
+                return
+            after_id = rows[-1][0]
+
+    def get_cursor(self, sid):
+        with self._lock:
+            row = self._conn.execute("SELECT cursor FROM export_cursors WHERE sid = ?", (sid,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def set_cursor(self, sid, cursor):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO export_cursors (sid, cursor) VALUES (?, ?) "
+                "ON CONFLICT(sid) DO UPDATE SET cursor = excluded.cursor",
+                (sid, json.dumps(cursor)),
+            )
+
+    # Download links carry a short-lived token instead of the session id, so a
+    # shared or logged link stops working and never reveals the session.
+    def issue_token(self, sid, ttl=EXPORT_TOKEN_TTL_SECONDS):
+        """Return (token, expires_at) for downloading `sid`'s export."""
+        token, expires_at = secrets.token_urlsafe(24), time.time() + ttl
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM export_tokens WHERE expires_at <= ?", (time.time(),))
+            self._conn.execute("INSERT INTO export_tokens (token, sid, expires_at) VALUES (?, ?, ?)", (token, sid, expires_at))
+        return token, expires_at
+
+    def redeem_token(self, token):
+        """The session id a token was issued for, or None if it is unknown or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sid FROM export_tokens WHERE token = ? AND expires_at > ?", (token, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+
+# --- Export Records ---
+def _load(store, sid, key, default):
+    blob = store.load(sid, key)
+    return session_store.decode(blob) if blob is not None else default
+
+
+def iter_records(sid, store, generations, since=None, cursor_out=None, blobs=None):
+    """Yield ("history" | "gallery" | "generation", record, image_bytes) for a session.
+
+    With a `since` cursor only entries added after that export are produced.
+    The cursor describing this export is written into `cursor_out`.
+    """
+    since = since or {}
+    cursor = {"exported_at": datetime.datetime.now(datetime.timezone.utc).isoformat()}
+
+    history = _load(store, sid, "prompt_history", {})
+    # History is keyed by day and today's list may still grow, so the day of
+    # the previous export is included again rather than risk dropping entries.
+    since_date = since.get("history_date", "")
+    for date_str in sorted(history):
+        if date_str < since_date:
+            continue
+        for prompt in history[date_str]:
+            yield "history", {"date": date_str, **prompt}, None
+    cursor["history_date"] = max(history, default=since_date)
+
+    blobs = blobs or session_memory.BlobStore()
+    gallery = _load(store, sid, "gallery", [])
+    # The gallery is capped and drops its oldest items, so new items are
+    # found by share time rather than by position.
+    shared_since = since.get("gallery_shared_at", 0)
+    for index, item in enumerate(gallery):
+        if since and item.get("shared_at", 0) <= shared_since:
+            continue
+        record = {"index": index, "work": item["work"], "feedback": item["feedback"]}
+        yield "gallery", record, session_memory.gallery_image(item, blobs)
+    cursor["gallery_shared_at"] = max([shared_since] + [item.get("shared_at", 0) for item in gallery])
+    del gallery
+
+    last_id = since.get("generation_id", 0)
+    for record in generations.iter_since(sid, last_id):
+        last_id = record["id"]
+        yield "generation", record, None
+    cursor["generation_id"] = last_id
+
+    if cursor_out is not None:
+        cursor_out.update(cursor)
+
+
+# --- Streaming Writers ---
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable sink whose bytes are handed out as soon as they are written."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_jsonl(records):
+    for kind, record, image in records:
+        line = {"type": kind, **record}
+        if image is not None:
+            line["image_base64"] = base64.b64encode(image).decode("ascii")
+        yield (json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def stream_zip(records, part_size=200):
+    """Build a zip archive on the fly; memory use is bounded by one image or one part file.
+
+    The sink is unseekable, so zipfile writes data descriptors after each entry
+    instead of seeking back to patch headers. Records are written as numbered
+    JSONL part files of `part_size` lines each.
+    """
+    sink = _ChunkSink()
+    buffers = {}
+    parts = {}
+
+    def write_part(kind):
+        part = parts.get(kind, 0)
+        parts[kind] = part + 1
+        with archive.open(f"{kind}/part-{part:04d}.jsonl", mode="w") as entry:
+            entry.write(("\n".join(buffers.pop(kind)) + "\n").encode("utf-8"))
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for kind, record, image in records:
+            if image is not None:
+                record = {**record, "image": f"gallery/{record['index']:05d}.img"}
+                with archive.open(record["image"], mode="w") as entry:
+                    entry.write(image)
+                yield sink.drain()
+            buffers.setdefault(kind, []).append(json.dumps(record, ensure_ascii=False))
+            if len(buffers[kind]) >= part_size:
+                write_part(kind)
+                yield sink.drain()
+        for kind in list(buffers):
+            write_part(kind)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_export(sid, store, generations, fmt="zip", incremental=False):
+    """Yield the bytes of a session export and advance its cursor once fully streamed."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Export format must be one of {', '.join(EXPORT_FORMATS)}")
+    since = generations.get_cursor(sid) if incremental else None
+    cursor = {}
+    records = iter_records(sid, store, generations, since, cursor)
+    yield from (stream_zip(records) if fmt == "zip" else stream_jsonl(records))
+    generations.set_cursor(sid, cursor)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a session's history, gallery and generations to a file.")
+    parser.add_argument("sid", help="Session id (the 'sid' query parameter of the app URL)")
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="zip")
+    parser.add_argument("--since-last", action="store_true", help="Only include entries added since the last export")
+    args = parser.parse_args(argv)
+
+    store, generations = session_store.open_store(), GenerationStore()
+    with open(args.output, "wb") as out:
+        for chunk in stream_export(args.sid, store, generations, args.format, args.since_last):
+            out.write(chunk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+try:
+    from google.api_core import exceptions as api_exceptions
+except ImportError:  # Keep the stand-in usable without the Google client libraries.
+    api_exceptions = None
+
+# --- Configuration ---
+# Latencies are in milliseconds. Errors are drawn with probability
+# FAKE_GEMINI_ERROR_RATE and their type is chosen by FAKE_GEMINI_ERRORS,
+# a comma-separated list of name:weight pairs.
+FAKE_GEMINI_LATENCY_MS = float(os.environ.get("FAKE_GEMINI_LATENCY_MS", "0"))
+FAKE_GEMINI_JITTER_MS = float(os.environ.get("FAKE_GEMINI_JITTER_MS", "0"))
+FAKE_GEMINI_ERROR_RATE = float(os.environ.get("FAKE_GEMINI_ERROR_RATE", "0"))
+FAKE_GEMINI_ERRORS = os.environ.get("FAKE_GEMINI_ERRORS", "quota:3,unavailable:1,deadline:1")
+FAKE_GEMINI_WORDS = int(os.environ.get("FAKE_GEMINI_WORDS", "120"))
+FAKE_GEMINI_SEED = os.environ.get("FAKE_GEMINI_SEED")
+FAKE_TTS_LATENCY_MS = float(os.environ.get("FAKE_TTS_LATENCY_MS", "0"))
+
+WORDS = (
+    "the a dragon city signal river lantern machine whisper forest orbit detective "
+    "archive ember glass storm garden circuit mirror voyage echo harbor shadow"
+).split()
+
+# A single silent MPEG-1 Layer III frame, enough for st.audio to accept the bytes.
+SILENT_MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+def offline_environment(workdir=None):
+    """Point the app's model, TTS and every store at offline stand-ins under `workdir`.
+
+    Call this before importing tools/app modules, which read these at import time.
+    Values already present in the environment are left alone.
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix="prompt-hub-offline-")
+    defaults = {
+        "GEMINI_BACKEND": "fake",
+        "TTS_BACKEND": "fake",
+        "SESSION_STORE_URL": "memory://",
+        "API_PORT": "",
+        "GAMIFICATION_DB": os.path.join(workdir, "gamification.db"),
+        "ACTIVITY_LOG": os.path.join(workdir, "activity_log.jsonl"),
+        "GENERATIONS_DB": os.path.join(workdir, "generations.db"),
+        "BLOB_DIR": os.path.join(workdir, "blobs"),
+        "WARMUP_DB": os.path.join(workdir, "warmup.db"),
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+    return workdir
+
+
+def _error(name, message):
+    if api_exceptions is not None:
+        cls = {
+            "quota": api_exceptions.ResourceExhausted,
+            "unavailable": api_exceptions.ServiceUnavailable,
+            "deadline": api_exceptions.DeadlineExceeded,
+            "invalid": api_exceptions.InvalidArgument,
+        }.get(name)
+        if cls is not None:
+            return cls(message)
+    return RuntimeError(f"{name}: {message}")
+
+
+def _parse_weights(spec):
+    weights = {}
+    for part in spec.split(","):
+        if part.strip():
+            name, _, weight = part.partition(":")
+            weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+class FakeResponse:
+    """Mimics the parts of GenerateContentResponse the app uses."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    @property
+    def text(self):
+        return "".join(chunk.text for chunk in self._chunks)
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    def resolve(self):
+        return self
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Offline stand-in for genai.GenerativeModel with configurable latency and failures.
+
+    Output is derived from a hash of the prompt, so identical requests get
+    identical text, like a cache-friendly deterministic model would.
+    """
+
+    def __init__(self, model_name="gemini-2.5-flash", latency_ms=None, jitter_ms=None,
+                 error_rate=None, errors=None, words=None, seed=None):
+        self.model_name = model_name
+        self.latency_ms = FAKE_GEMINI_LATENCY_MS if latency_ms is None else latency_ms
+        self.jitter_ms = FAKE_GEMINI_JITTER_MS if jitter_ms is None else jitter_ms
+        self.error_rate = FAKE_GEMINI_ERROR_RATE if error_rate is None else error_rate
+        self.errors = _parse_weights(FAKE_GEMINI_ERRORS) if errors is None else errors
+        self.words = FAKE_GEMINI_WORDS if words is None else words
+        self._rng = random.Random(FAKE_GEMINI_SEED if seed is None else seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _sleep(self, fraction=1.0):
+        with self._lock:
+            delay = max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms)) if self.jitter_ms else self.latency_ms
+        if delay:
+            time.sleep(delay * fraction / 1000)
+
+    def _maybe_fail(self):
+        with self._lock:
+            failed = self.error_rate and self._rng.random() < self.error_rate
+            name = self._rng.choices(list(self.errors), weights=list(self.errors.values()))[0] if failed else None
+        if name:
+            raise _error(name, f"Simulated {name} error from the fake Gemini backend.")
+
+    def _text_for(self, contents):
+        parts = contents if isinstance(contents, (list, tuple)) else [contents]
+        prompt = " ".join(part if isinstance(part, str) else type(part).__name__ for part in parts)
+        seed = int.from_bytes(hashlib.sha1(prompt.encode("utf-8")).digest()[:8], "big")
+        rng = random.Random(seed)
+        body = " ".join(rng.choice(WORDS) for _ in range(self.words))
+        return f"**{self.model_name}** on _{prompt[:60]}_\n\n{body}."
+
+    def _json_for(self, schema, rng):
+        kind = schema.get("type", "STRING").upper()
+        if kind == "OBJECT":
+            return {name: self._json_for(prop, rng) for name, prop in schema.get("properties", {}).items()}
+        if kind == "ARRAY":
+            return [self._json_for(schema["items"], rng) for _ in range(rng.randint(2, 4))]
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+
+    def generate_content(self, contents, stream=False, generation_config=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        self._maybe_fail()
+        text = self._text_for(contents)
+        schema = (generation_config or {}).get("response_schema")
+        if schema:
+            # Same prompt, same structure: reseed from the prose derived from the prompt.
+            text = json.dumps(self._json_for(schema, random.Random(text)))
+        if not stream:
+            self._sleep()
+            return FakeResponse([_Chunk(text)])
+        pieces = [text[i:i + 64] for i in range(0, len(text), 64)]
+
+        def chunks():
+            for piece in pieces:
+                self._sleep(1 / len(pieces))
+                yield _Chunk(piece)
+
+        return _StreamingResponse(chunks())
+
+
+class _StreamingResponse(FakeResponse):
+    def __init__(self, iterator):
+        super().__init__([])
+        self._iterator = iterator
+
+    def __iter__(self):
+        for chunk in self._iterator:
+            self._chunks.append(chunk)
+            yield chunk
+
+    def resolve(self):
+        for _ in self:
+            pass
+        return self
+
+
+class FakeTTS:
+    """Offline stand-in for gTTS: sleeps for the configured latency and writes a silent frame."""
+
+    def __init__(self, text, lang="en", latency_ms=None):
+        self.text = text
+        self.lang = lang
+        self.latency_ms = FAKE_TTS_LATENCY_MS if latency_ms is None else latency_ms
+
+    def write_to_fp(self, fp):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        fp.write(SILENT_MP3_FRAME)
@@ -0,0 +1,227 @@
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+DB_PATH = os.environ.get("GAMIFICATION_DB", "gamification.db")
+LOG_PATH = os.environ.get("ACTIVITY_LOG", "activity_log.jsonl")
+
+# --- Badge Rules ---
+# Each rule is checked against the user's aggregate row after an event is
+# applied, so awarding a badge never needs to look at the event history.
+BADGES = {
+    "5-Day Streak": lambda stats: stats["streak"] >= 5,
+    "10 Prompts Completed": lambda stats: stats["completed"] >= 10,
+    "50 Prompts Completed": lambda stats: stats["completed"] >= 50,
+    "30-Day Streak": lambda stats: stats["streak"] >= 30,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    completed INTEGER NOT NULL DEFAULT 0,
+    streak INTEGER NOT NULL DEFAULT 0,
+    best_streak INTEGER NOT NULL DEFAULT 0,
+    last_active TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_user_stats_completed ON user_stats (completed DESC);
+CREATE INDEX IF NOT EXISTS idx_user_stats_best_streak ON user_stats (best_streak DESC);
+CREATE TABLE IF NOT EXISTS user_badges (
+    user_id TEXT NOT NULL,
+    badge TEXT NOT NULL,
+    awarded_on TEXT NOT NULL,
+    PRIMARY KEY (user_id, badge)
+);
+CREATE TABLE IF NOT EXISTS global_stats (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_names (
+    user_id TEXT PRIMARY KEY,
+    display_name TEXT NOT NULL
+);
+"""
+
+LEADERBOARD_COLUMNS = {"completed": "completed", "streak": "best_streak"}
+
+
+class BadgeEngine:
+    """Activity-event log plus incrementally maintained per-user and global aggregates."""
+
+    def __init__(self, db_path=DB_PATH, log_path=LOG_PATH):
+        self.db_path = db_path
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    # --- Writes ---
+    def record_completion(self, user_id, category=None, when=None, display_name=None):
+        """Append a completion event to the log and fold it into the aggregates.
+
+        `user_id` identifies the user; `display_name` is only shown on the
+        leaderboard. Returns the list of badges newly awarded by this event.
+        """
+        event = {
+            "type": "completion",
+            "user_id": user_id,
+            "category": category,
+            "date": (when or datetime.date.today()).isoformat(),
+        }
+        if display_name:
+            event["display_name"] = display_name
+        with self._lock, self._conn:
+            # Take the write lock before reading the row, so replicas sharing
+            # the file cannot interleave their read-modify-write. The log line
+            # is written under the same lock, so a rebuild() on another replica
+            # sees the event and its aggregate update together or not at all.
+            self._conn.execute("BEGIN IMMEDIATE")
+            new_badges = self._apply(event)
+            with open(self.log_path, "a", encoding="utf-8") as log:
+                log.write(json.dumps(event) + "\n")
+            return new_badges
+
+    def _apply(self, event):
+        user_id = event["user_id"]
+        day = datetime.date.fromisoformat(event["date"])
+        row = self._conn.execute(
+            "SELECT completed, streak, best_streak, last_active FROM user_stats WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+
+        if row is None:
+            completed, streak, best_streak, last_active = 0, 0, 0, None
+            self._bump_global("total_users")
+        else:
+            completed, streak, best_streak, last_active = row
+            last_active = datetime.date.fromisoformat(last_active) if last_active else None
+
+        completed += 1
+        if last_active is None or (day - last_active).days > 1:
+            streak = 1
+        elif (day - last_active).days == 1:
+            streak += 1
+        best_streak = max(best_streak, streak)
+        last_active = max(day, last_active) if last_active else day
+
+        self._conn.execute(
+            "INSERT INTO user_stats (user_id, completed, streak, best_streak, last_active) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET completed = excluded.completed, streak = excluded.streak, "
+            "best_streak = excluded.best_streak, last_active = excluded.last_active",
+            (user_id, completed, streak, best_streak, last_active.isoformat()),
+        )
+        self._bump_global("total_completions")
+
+        stats = {"completed": completed, "streak": streak}
+        owned = {r[0] for r in self._conn.execute("SELECT badge FROM user_badges WHERE user_id = ?", (user_id,))}
+        new_badges = [name for name, rule in BADGES.items() if name not in owned and rule(stats)]
+        self._conn.executemany(
+            "INSERT INTO user_badges (user_id, badge, awarded_on) VALUES (?, ?, ?)",
+            [(user_id, badge, event["date"]) for badge in new_badges],
+        )
+        if new_badges:
+            self._bump_global("total_badges", len(new_badges))
+        if event.get("display_name"):
+            self._conn.execute(
+                "INSERT INTO user_names (user_id, display_name) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET display_name = excluded.display_name",
+                (user_id, event["display_name"]),
+            )
+        return new_badges
+
+    def _bump_global(self, key, amount=1):
+        self._conn.execute(
+            "INSERT INTO global_stats (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+            (key, amount),
+        )
+
+    # --- Reads ---
+    def stats(self, user_id, today=None):
+        """Return the user's counters and badges; a streak with a missed day reads as 0."""
+        today = today or datetime.date.today()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT completed, streak, best_streak, last_active FROM user_stats WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+            badges = [r[0] for r in self._conn.execute(
+                "SELECT badge FROM user_badges WHERE user_id = ? ORDER BY awarded_on, badge", (user_id,)
+            )]
+        if row is None:
+            return {"completed": 0, "streak": 0, "best_streak": 0, "last_active": None, "badges": badges}
+        streak = row["streak"]
+        if row["last_active"] and (today - datetime.date.fromisoformat(row["last_active"])).days > 1:
+            streak = 0
+        return {
+            "completed": row["completed"],
+            "streak": streak,
+            "best_streak": row["best_streak"],
+            "last_active": row["last_active"],
+            "badges": badges,
+        }
+
+    def leaderboard(self, limit=10, by="completed"):
+        """Top-N users by an aggregate column, served straight from the index."""
+        column = LEADERBOARD_COLUMNS[by]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.user_id, COALESCE(n.display_name, s.user_id) AS display_name, s.completed, s.best_streak "
+                "FROM user_stats s LEFT JOIN user_names n ON n.user_id = s.user_id "
+                f"ORDER BY s.{column} DESC, s.user_id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def global_stats(self):
+        with self._lock:
+            return {key: value for key, value in self._conn.execute("SELECT key, value FROM global_stats")}
+
+    # --- Maintenance ---
+    def rebuild(self):
+        """Drop all aggregates and replay the activity log from the beginning."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM user_stats")
+            self._conn.execute("DELETE FROM user_badges")
+            self._conn.execute("DELETE FROM global_stats")
+            self._conn.execute("DELETE FROM user_names")
+            replayed = 0
+            if os.path.exists(self.log_path):
+                with open(self.log_path, encoding="utf-8") as log:
+                    for line in log:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        event = json.loads(line)
+                        if event.get("type") == "completion":
+                            self._apply(event)
+                            replayed += 1
+        return replayed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the badge and leaderboard aggregates.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--log", default=LOG_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="Rebuild aggregates from the activity log")
+    board = sub.add_parser("leaderboard", help="Print the top-N leaderboard")
+    board.add_argument("-n", type=int, default=10)
+    board.add_argument("--by", choices=sorted(LEADERBOARD_COLUMNS), default="completed")
+    args = parser.parse_args(argv)
+
+    engine = BadgeEngine(args.db, args.log)
+    if args.command == "rebuild":
+        print(f"Replayed {engine.rebuild()} events from {args.log}")
+    else:
+        for rank, row in enumerate(engine.leaderboard(args.n, args.by), 1):
+            print(f"{rank:>3}. {row['display_name']:<24} {row['completed']:>6} completed  {row['best_streak']:>4} best streak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import argparse
+import collections
+import contextlib
+import gc
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+import fake_gemini
+
+# Load tests always run offline; see fake_gemini.offline_environment().
+fake_gemini.offline_environment()
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+import session_memory
+import tools
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+# _share_replica_state() patches Streamlit internals; this is the release it
+# was validated against, pinned in requirements.txt.
+VALIDATED_STREAMLIT = "1.66"
+
+# --- Scenarios ---
+# Each step is (action, widget label, value). Values may use {session} and
+# {api_key}, which are filled in per simulated session.
+SCENARIOS = {
+    "browse": [
+        ("open", None, None),
+        ("select", "Filter by Difficulty", "Easy"),
+        ("select", "Filter by Difficulty", "Hard"),
+        ("select", "Filter by Difficulty", "All"),
+    ],
+    "meal_plan_and_story": [
+        ("open", None, None),
+        ("input", "Enter your Gemini API key", "{api_key}"),
+        ("select", "Filter by Difficulty", "Medium"),
+        ("input", "Any dietary requirements or preferences (e.g., vegan, low-carb)?", "vegetarian, session {session}"),
+        ("click", "Generate Meal Plan", None),
+        ("input", "Start a story:", "A lighthouse keeper finds a letter dated tomorrow ({session})."),
+        ("click", "Begin Story", None),
+        ("input", "Your turn:", "The letter is in their own handwriting."),
+        ("click", "Add to Story", None),
+    ],
+    "tools_tour": [
+        ("open", None, None),
+        ("input", "Enter your Gemini API key", "{api_key}"),
+        ("input", "Enter a complex topic to explain simply:", "entropy {session}"),
+        ("click", "Explain Like I'm 5", None),
+        ("input", "What is your product or brand?", "solar kettle {session}"),
+        ("click", "Generate Slogans", None),
+        ("input", "Enter a topic for your mind map:", "urban gardening"),
+        ("click", "Generate Mind Map", None),
+    ],
+}
+
+_WIDGET_KINDS = {
+    "input": ("text_input", "text_area"),
+    "select": ("selectbox", "radio"),
+    "click": ("button",),
+}
+
+
+def _share_replica_state():
+    """Make concurrent AppTests share what sessions on one real replica share.
+
+    AppTest installs a mock Runtime for each run and clears it afterwards, and
+    builds a fresh script cache every time, which recompiles app.py per rerun
+    and breaks sessions running at the same time. A Streamlit server has one
+    runtime and one compiled script for all sessions, so keep the first of each.
+    Returns a function that puts the originals back.
+    """
+    try:
+        from streamlit import config
+        from streamlit.runtime import Runtime
+        from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+        from streamlit.testing.v1 import app_test
+        from streamlit.testing.v1.util import build_mock_config_get_option
+    except ImportError as e:
+        raise SystemExit(_unsupported_streamlit(e)) from e
+    patched = [(Runtime, "instance"), (Runtime, "exists"), (ScriptCache, "get_bytecode"),
+               (config, "get_option"), (app_test, "patch_config_options")]
+    required = patched + [(Runtime, "_instance")]
+    missing = [f"{getattr(owner, '__name__', owner)}.{name}" for owner, name in required if not hasattr(owner, name)]
+    if missing:
+        raise SystemExit(_unsupported_streamlit(f"missing {', '.join(missing)}"))
+    originals = [(owner, name, owner.__dict__[name]) for owner, name in patched if name in owner.__dict__]
+
+    shared = {}
+    original_instance = Runtime.instance.__func__
+    original_get_bytecode = ScriptCache.get_bytecode
+    compile_lock = threading.Lock()
+
+    def instance(cls):
+        if "runtime" not in shared:
+            shared["runtime"] = original_instance(cls)
+        return shared["runtime"]
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            if script_path not in shared:
+                shared[script_path] = original_get_bytecode(self, script_path)
+            return shared[script_path]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: "runtime" in shared or cls._instance is not None)
+    ScriptCache.get_bytecode = get_bytecode
+
+    # AppTest also patches config.get_option for the length of each run. The
+    # first run to finish restores the real option while other sessions are
+    # still running, so their widgets skip the bookkeeping AppTest reads back
+    # (KeyError in get_widget_states). Apply the override once for all runs.
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+
+    def restore():
+        for owner, name, value in originals:
+            setattr(owner, name, value)
+
+    return restore
+
+
+def _unsupported_streamlit(reason):
+    return (
+        f"loadtest.py was validated against Streamlit {VALIDATED_STREAMLIT}.x and cannot patch "
+        f"Streamlit {streamlit.__version__} ({reason}). Install the version pinned in requirements.txt."
+    )
+
+
+def _find(at, action, label):
+    for kind in _WIDGET_KINDS[action]:
+        for widget in getattr(at, kind):
+            if widget.label == label:
+                return widget
+    raise LookupError(f"No {action} widget labelled {label!r}")
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+# --- Simulated Sessions ---
+def _describe(error):
+    return f"{type(error).__name__}: {error}"
+
+
+def run_session(scenario, session, think_time, latencies, lock):
+    """Play one scenario as a fresh browser session; returns (AppTest, outcome, detail).
+
+    The outcome is "ok", "app_error" (st.error shown), "exception" (app.py
+    raised) or "harness_error" (the simulation itself failed, which says
+    nothing about the app).
+    """
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    values = {"session": session, "api_key": f"load-test-key-{session}"}
+    try:
+        for action, label, value in SCENARIOS[scenario]:
+            if action != "open":
+                widget = _find(at, action, label)
+                if action == "click":
+                    widget.click()
+                elif action == "select":
+                    widget.set_value(value)
+                else:
+                    widget.input(value.format(**values))
+            started = time.perf_counter()
+            at.run()
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+            if at.exception:
+                return at, "exception", at.exception[0].message
+            if think_time:
+                time.sleep(think_time)
+    except Exception as e:
+        return at, "harness_error", _describe(e)
+    if at.error:
+        return at, "app_error", at.error[0].value
+    return at, "ok", None
+
+
+def run_level(concurrency, sessions_per_worker, scenarios, think_time):
+    latencies, outcomes, live_sessions = [], [], []
+    details = collections.Counter()
+    lock = threading.Lock()
+    counter = iter(range(10 ** 9))
+
+    def worker():
+        for _ in range(sessions_per_worker):
+            with lock:
+                session = next(counter)
+            scenario = scenarios[session % len(scenarios)]
+            at, outcome, detail = run_session(scenario, session, think_time, latencies, lock)
+            with lock:
+                outcomes.append(outcome)
+                live_sessions.append(at)
+                if detail:
+                    details[f"{outcome}: {detail}"] += 1
+
+    gc.collect()
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, name=f"load-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+    gc.collect()
+    rss_after = _rss_bytes()
+
+    state_bytes = [
+        sum(entry["bytes"] for entry in session_memory.memory_report(at.session_state).values())
+        for at in live_sessions
+    ]
+    latencies.sort()
+
+    def pct(q):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))] if latencies else 0.0
+
+    sessions = len(outcomes)
+    result = {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "duration_s": duration,
+        "throughput_rps": len(latencies) / duration if duration else 0.0,
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+        "failure_rate": outcomes.count("exception") / sessions if sessions else 0.0,
+        "app_error_rate": outcomes.count("app_error") / sessions if sessions else 0.0,
+        "harness_error_rate": outcomes.count("harness_error") / sessions if sessions else 0.0,
+        "errors": dict(details.most_common(10)),
+        "rss_per_session_kib": (rss_after - rss_before) / sessions / 1024 if sessions else 0.0,
+        "state_per_session_kib": statistics.fmean(state_bytes) / 1024 if state_bytes else 0.0,
+    }
+    del live_sessions
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ramp concurrent simulated sessions against app.py on one process.")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Comma-separated concurrency levels to ramp through")
+    parser.add_argument("--sessions-per-worker", type=int, default=3)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario(s) to replay round-robin (default: all)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds a user pauses between steps")
+    parser.add_argument("--model-latency-ms", type=float, default=fake_gemini.FAKE_GEMINI_LATENCY_MS)
+    parser.add_argument("--model-jitter-ms", type=float, default=fake_gemini.FAKE_GEMINI_JITTER_MS)
+    parser.add_argument("--model-error-rate", type=float, default=fake_gemini.FAKE_GEMINI_ERROR_RATE)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to a JSON file")
+    args = parser.parse_args(argv)
+
+    restore_streamlit = _share_replica_state()
+    try:
+        _run(args)
+    finally:
+        restore_streamlit()
+
+
+def _run(args):
+    tools._fake_model = fake_gemini.FakeGenerativeModel(
+        tools.MODEL_NAME,
+        latency_ms=args.model_latency_ms,
+        jitter_ms=args.model_jitter_ms,
+        error_rate=args.model_error_rate,
+    )
+    scenarios = args.scenario or sorted(SCENARIOS)
+
+    header = f"{'conc':>4} {'sess':>5} {'reruns':>6} {'rps':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'fail':>6} {'app err':>7} {'harness':>7} {'RSS/sess':>9} {'state/sess':>10}"
+    print(header)
+    results = []
+    for level in [int(n) for n in args.levels.split(",") if n.strip()]:
+        result = run_level(level, args.sessions_per_worker, scenarios, args.think_time)
+        results.append(result)
+        print(
+            f"{result['concurrency']:>4} {result['sessions']:>5} {result['reruns']:>6} {result['throughput_rps']:>7.1f} "
+            f"{result['p50_ms']:>8.1f} {result['p90_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+            f"{result['failure_rate']:>6.1%} {result['app_error_rate']:>7.1%} {result['harness_error_rate']:>7.1%} "
+            f"{result['rss_per_session_kib']:>6.0f}KiB {result['state_per_session_kib']:>7.1f}KiB",
+            flush=True,
+        )
+        for detail, count in result["errors"].items():
+            print(f"       {count}x {detail}", flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as out:
+            json.dump({"scenarios": scenarios, "levels": results}, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
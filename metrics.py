@@ -0,0 +1,183 @@
+import bisect
+import os
+import threading
+import time
+
+ACTIVE_SESSION_WINDOW_SECONDS = int(os.environ.get("ACTIVE_SESSION_WINDOW_SECONDS", "300"))
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+IMAGE_BYTES_BUCKETS = (16e3, 64e3, 256e3, 1e6, 4e6, 16e6)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+# --- Metric Types ---
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(self._sample_lines(items))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _sample_lines(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """A gauge whose value is computed by `fn` when the metrics are scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, fn):
+        super().__init__(name, help)
+        self.fn = fn
+
+    def _sample_lines(self, items):
+        return [f"{self.name} {_format_value(self.fn())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def _sample_lines(self, items):
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# --- Active Sessions ---
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def touch_session(sid):
+    """Mark a session as seen now; called once per script run."""
+    with _sessions_lock:
+        _sessions[sid] = time.monotonic()
+
+
+def active_sessions(window=ACTIVE_SESSION_WINDOW_SECONDS):
+    cutoff = time.monotonic() - window
+    with _sessions_lock:
+        for sid in [sid for sid, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[sid]
+        return len(_sessions)
+
+
+# --- Prompt Hub Metrics ---
+generate_content_seconds = Histogram(
+    "prompt_hub_generate_content_seconds",
+    "Latency of Gemini generate_content calls.",
+    ("tool", "model"),
+)
+tts_seconds = Histogram(
+    "prompt_hub_tts_synthesis_seconds",
+    "Time spent synthesising prompt audio.",
+    ("lang",),
+)
+image_bytes = Histogram(
+    "prompt_hub_image_upload_bytes",
+    "Size of images uploaded for feedback.",
+    buckets=IMAGE_BYTES_BUCKETS,
+)
+errors_total = Counter(
+    "prompt_hub_errors_total",
+    "Failed external calls by component (model, tts) and exception type (ResourceExhausted is a quota error).",
+    ("component", "type"),
+)
+# Counted separately from errors_total: a failed model call also fails the
+# tool that made it, and summing both would count it twice.
+tool_failures_total = Counter(
+    "prompt_hub_tool_failures_total",
+    "Failed tool invocations by surface (ui, api), tool and exception type.",
+    ("surface", "tool", "type"),
+)
+tool_cache_total = Counter(
+    "prompt_hub_tool_cache_total",
+    "Tool requests by cache outcome: hit (in-memory cache), warm (warm-up store) or miss (model call).",
+    ("tool", "result"),
+)
+Gauge(
+    "prompt_hub_active_sessions",
+    f"Sessions that ran the script in the last {ACTIVE_SESSION_WINDOW_SECONDS} seconds.",
+    active_sessions,
+)
+
+
+def record_tool_failure(surface, tool_id, error):
+    tool_failures_total.inc(surface=surface, tool=tool_id, type=type(error).__name__)
+
+
+def record_call(kind, name, elapsed, error, model=None):
+    """Record one external call; tools.py calls this after every model and TTS request."""
+    if kind == "model":
+        generate_content_seconds.observe(elapsed, tool=name or "direct", model=model)
+    elif kind == "tts":
+        tts_seconds.observe(elapsed, lang=name)
+    if error is not None:
+        errors_total.inc(component=kind, type=type(error).__name__)
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,192 @@
+import collections
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import secrets
+import sys
+import threading
+import time
+
+import tools
+
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "") == "1"
+# Lets a single session turn profiling on with ?profile=<token>; unset, only
+# PROFILING_ENABLED can, so visitors cannot add overhead or write captures.
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "20"))
+SAMPLE_INTERVAL_SECONDS = float(os.environ.get("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+CAPTURE_MODES = ("cprofile", "stacks")
+
+_local = threading.local()
+
+
+class RerunProfiler:
+    """Timings for one script run.
+
+    Top-level sections are delimited by checkpoints: each checkpoint closes the
+    previous section, so the sections add up to the whole run. Nested work
+    such as a tool call is timed separately with `section()`. External calls
+    made on this thread are counted through the tools observer hook.
+    """
+
+    enabled = True
+
+    def __init__(self, capture=None):
+        self.capture = capture if capture in CAPTURE_MODES else None
+        self.started = time.perf_counter()
+        self.sections = []
+        self.nested = []
+        self.external = collections.defaultdict(lambda: {"calls": 0, "ms": 0.0, "errors": 0})
+        self._current = None
+        self._current_started = self.started
+        self._profile = None
+        self._sampler = None
+        self._samples = collections.Counter()
+        self._stopped = threading.Event()
+        self.total_ms = None
+        if self.capture == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.capture == "stacks":
+            target = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample, args=(target,), name="rerun-profiler", daemon=True)
+            self._sampler.start()
+
+    # --- Recording ---
+    def checkpoint(self, name):
+        now = time.perf_counter()
+        if self._current is not None:
+            self.sections.append((self._current, (now - self._current_started) * 1000))
+        self._current, self._current_started = name, now
+
+    @contextlib.contextmanager
+    def section(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.nested.append((name, (time.perf_counter() - started) * 1000))
+
+    def record_external(self, kind, elapsed, error):
+        entry = self.external[kind]
+        entry["calls"] += 1
+        entry["ms"] += elapsed * 1000
+        entry["errors"] += error is not None
+
+    def stop(self):
+        if self.total_ms is not None:
+            return
+        self.checkpoint(None)
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+        self._stopped.set()
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+
+    # --- Stack Sampling ---
+    def _sample(self, target):
+        deadline = time.monotonic() + 120  # Never outlive a run that was abandoned by st.rerun().
+        while not self._stopped.wait(SAMPLE_INTERVAL_SECONDS) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self._samples[";".join(reversed(stack))] += 1
+
+    # --- Output ---
+    def cprofile_stats(self, limit=30):
+        if self._profile is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def folded_stacks(self):
+        """Samples in the collapsed format read by flamegraph.pl and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self._samples.most_common())
+
+    def dump(self, directory=PROFILE_DIR, keep=PROFILE_KEEP):
+        """Write the capture for this run to `directory`; returns the path or None.
+
+        Only the newest `keep` captures in `directory` are kept.
+        """
+        if self.capture is None:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        if self.capture == "cprofile":
+            path = os.path.join(directory, f"rerun-{stamp}-{threading.get_ident()}.prof")
+            self._profile.dump_stats(path)
+        else:
+            path = os.path.join(directory, f"rerun-{stamp}-{threading.get_ident()}.folded")
+            with open(path, "w", encoding="utf-8") as out:
+                out.write(self.folded_stacks())
+        _prune(directory, keep)
+        return path
+
+
+def _prune(directory, keep):
+    captures = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith("rerun-") and name.endswith((".prof", ".folded"))
+    ]
+    captures.sort(key=os.path.getmtime, reverse=True)
+    for path in captures[keep:]:
+        with contextlib.suppress(OSError):  # Another process may have pruned it already.
+            os.remove(path)
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off, so instrumentation costs nothing."""
+
+    enabled = False
+
+    def checkpoint(self, name):
+        pass
+
+    def section(self, name):
+        return contextlib.nullcontext()
+
+    def record_external(self, kind, elapsed, error):
+        pass
+
+    def stop(self):
+        pass
+
+
+_NULL = NullProfiler()
+
+
+def requested(token):
+    """Whether a ?profile= value turns profiling on for one session."""
+    return bool(PROFILE_TOKEN) and token is not None and secrets.compare_digest(
+        token.encode("utf-8"), PROFILE_TOKEN.encode("utf-8")
+    )
+
+
+def _observe(kind, name, elapsed, error):
+    current().record_external(kind, elapsed, error)
+
+
+def start(enabled, capture=None):
+    """Begin profiling the script run on this thread; returns the active profiler."""
+    previous = getattr(_local, "profiler", None)
+    if previous is not None:
+        previous.stop()  # A run cut short by st.rerun() never reached its own stop().
+    profiler = RerunProfiler(capture) if enabled else _NULL
+    _local.profiler = profiler
+    if enabled:
+        tools.add_observer(_observe)
+    return profiler
+
+
+def current():
+    return getattr(_local, "profiler", None) or _NULL
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+
+BLOB_DIR = os.environ.get("BLOB_DIR", "blobs")
+
+# --- Caps ---
+# Per-key limits on what a session may keep in memory. Older entries are
+# dropped first; the collaborative story keeps its opening line.
+CAPS = {
+    "prompt_history_days": int(os.environ.get("CAP_PROMPT_HISTORY_DAYS", "30")),
+    "prompt_history_per_day": int(os.environ.get("CAP_PROMPT_HISTORY_PER_DAY", "50")),
+    "gallery": int(os.environ.get("CAP_GALLERY_ITEMS", "100")),
+    "story": int(os.environ.get("CAP_STORY_PARTS", "200")),
+    "mind_map_nodes": int(os.environ.get("CAP_MIND_MAP_NODES", "500")),
+    "swot_points": int(os.environ.get("CAP_SWOT_POINTS", "50")),
+}
+
+TRACKED_KEYS = ("prompt_history", "gallery", "story", "mind_map", "swot")
+
+
+# --- Blob Spilling ---
+class BlobStore:
+    """Content-addressed files for large values, so identical uploads are stored once."""
+
+    def __init__(self, root=BLOB_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, ref):
+        return os.path.join(self.root, ref[:2], ref)
+
+    def put(self, data):
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
+        return ref
+
+    def get(self, ref):
+        try:
+            with open(self._path(ref), "rb") as fp:
+                return fp.read()
+        except FileNotFoundError:
+            return None
+
+
+def gallery_item(work, feedback, image, blobs):
+    """Build a gallery entry whose image lives in the blob store, not in session state."""
+    return {
+        "work": work,
+        "feedback": feedback,
+        "image_ref": blobs.put(image) if image else None,
+        "shared_at": time.time(),
+    }
+
+
+def gallery_image(item, blobs):
+    # Entries saved before images were spilled still carry the bytes inline.
+    if item.get("image_ref"):
+        return blobs.get(item["image_ref"])
+    return item.get("image")
+
+
+# --- Deduplication & Caps ---
+def remember_prompt(history, day, prompt):
+    """Record a prompt shown on `day` once, however many reruns display it."""
+    shown = history.setdefault(day, [])
+    if prompt not in shown:
+        shown.append(prompt)
+
+
+def enforce_caps(state, caps=CAPS):
+    """Trim the tracked keys in place; returns how many entries were dropped per key."""
+    dropped = {}
+    history = state.get("prompt_history")
+    if history:
+        for day in sorted(history)[:-caps["prompt_history_days"]]:
+            dropped["prompt_history"] = dropped.get("prompt_history", 0) + len(history.pop(day))
+        for day, shown in history.items():
+            excess = len(shown) - caps["prompt_history_per_day"]
+            if excess > 0:
+                del shown[:excess]
+                dropped["prompt_history"] = dropped.get("prompt_history", 0) + excess
+    gallery = state.get("gallery")
+    if gallery and len(gallery) > caps["gallery"]:
+        dropped["gallery"] = len(gallery) - caps["gallery"]
+        del gallery[:dropped["gallery"]]
+    story = state.get("story")
+    if story and len(story) > caps["story"]:
+        # After the opening, parts alternate between the user and the AI and
+        # the app reads whose turn it is from the length, so whole pairs are
+        # dropped; the story may end up one part under the cap.
+        count = min(len(story) - caps["story"] + 1, len(story) - 1) // 2 * 2
+        if count:
+            dropped["story"] = count
+            del story[1:count + 1]
+    mind_map = state.get("mind_map")
+    if mind_map and len(mind_map) > caps["mind_map_nodes"]:
+        dropped["mind_map"] = mind_map.truncate(caps["mind_map_nodes"])
+    swot = state.get("swot")
+    if swot:
+        for points in swot["quadrants"].values():
+            excess = len(points) - caps["swot_points"]
+            if excess > 0:
+                del points[caps["swot_points"]:]
+                dropped["swot"] = dropped.get("swot", 0) + excess
+    return dropped
+
+
+# --- Accounting ---
+def deep_sizeof(obj, seen=None):
+    """Approximate bytes held by `obj` and everything reachable through containers."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def memory_report(state, keys=TRACKED_KEYS):
+    """Bytes and entry counts for each tracked key present in `state`."""
+    report = {}
+    for key in keys:
+        if state.get(key) is not None:
+            value = state[key]
+            report[key] = {"bytes": deep_sizeof(value), "entries": len(value)}
+    return report
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def track(sid, report, idle_after=3600):
+    """Record a session's latest report in the process-wide view and forget idle sessions."""
+    now = time.time()
+    with _sessions_lock:
+        _sessions[sid] = (now, report)
+        for stale in [s for s, (seen, _) in _sessions.items() if now - seen > idle_after]:
+            del _sessions[stale]
+
+
+def top_consumers(n=5):
+    """The n sessions in this process holding the most tracked bytes, largest first."""
+    with _sessions_lock:
+        totals = [
+            (sid, sum(entry["bytes"] for entry in report.values()), report)
+            for sid, (_, report) in _sessions.items()
+        ]
+    totals.sort(key=lambda row: row[1], reverse=True)
+    return [{"session": sid[:8], "bytes": total, "keys": report} for sid, total, report in totals[:n]]
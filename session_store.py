@@ -0,0 +1,197 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    import redis
+except ImportError:  # Redis is optional; the SQLite backend needs only the stdlib.
+    redis = None
+
+SESSION_STORE_URL = os.environ.get("SESSION_STORE_URL", "sqlite:///sessions.db")
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(30 * 24 * 3600)))
+# How often a process deletes expired rows from the SQLite store while saving.
+SESSION_PRUNE_INTERVAL_SECONDS = int(os.environ.get("SESSION_PRUNE_INTERVAL_SECONDS", "3600"))
+
+
+# --- Serialization ---
+# Values are pickled and zlib-compressed. The store is shared only between our
+# own replicas, so it is trusted in the same way the process memory was.
+def encode(value):
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 6)
+
+
+def decode(blob):
+    return pickle.loads(zlib.decompress(blob))
+
+
+def digest(blob):
+    return hashlib.blake2b(blob, digest_size=16).digest()
+
+
+# --- Backends ---
+class MemoryStore:
+    """Process-local store; only useful for a single replica or for tests."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def load(self, sid, key):
+        with self._lock:
+            return self._data.get((sid, key))
+
+    def save(self, sid, items):
+        with self._lock:
+            for key, blob in items.items():
+                self._data[(sid, key)] = blob
+
+    def delete(self, sid):
+        with self._lock:
+            for k in [k for k in self._data if k[0] == sid]:
+                del self._data[k]
+
+
+class SQLiteStore:
+    """Shared SQLite file; every replica on the host (or a shared volume) sees the same sessions."""
+
+    def __init__(self, path, ttl=SESSION_TTL_SECONDS, prune_interval=SESSION_PRUNE_INTERVAL_SECONDS):
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_state ("
+            "sid TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (sid, key))"
+        )
+
+    def load(self, sid, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM session_state WHERE sid = ? AND key = ? AND updated_at > ?",
+                (sid, key, time.time() - self.ttl),
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, sid, items):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO session_state (sid, key, value, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(sid, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                [(sid, key, blob, now) for key, blob in items.items()],
+            )
+            # Every new visit adds rows, so expired sessions are pruned here
+            # rather than relying on a separate job nobody remembers to run.
+            if now >= self._next_prune:
+                self._next_prune = now + self.prune_interval
+                self._conn.execute("DELETE FROM session_state WHERE updated_at <= ?", (now - self.ttl,))
+
+    def delete(self, sid):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM session_state WHERE sid = ?", (sid,))
+
+    def expire(self):
+        """Remove rows untouched for longer than the TTL; returns the number removed."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM session_state WHERE updated_at <= ?", (time.time() - self.ttl,)
+            ).rowcount
+
+
+class RedisStore:
+    """One Redis hash per session, expiring after the TTL."""
+
+    def __init__(self, url, ttl=SESSION_TTL_SECONDS):
+        if redis is None:
+            raise RuntimeError("The 'redis' package is required for redis:// session stores.")
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+
+    def _name(self, sid):
+        return f"session:{sid}"
+
+    def load(self, sid, key):
+        return self._client.hget(self._name(sid), key)
+
+    def save(self, sid, items):
+        pipe = self._client.pipeline()
+        pipe.hset(self._name(sid), mapping=items)
+        pipe.expire(self._name(sid), self.ttl)
+        pipe.execute()
+
+    def delete(self, sid):
+        self._client.delete(self._name(sid))
+
+
+def open_store(url=SESSION_STORE_URL):
+    """Build a backend from a URL: sqlite:///path.db, redis://host:port/db or memory://."""
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    if url.startswith("memory://"):
+        return MemoryStore()
+    raise ValueError(f"Unsupported session store URL: {url}")
+
+
+# --- Binding to st.session_state ---
+class PersistedState:
+    """Mirrors selected keys of a session-state mapping into a shared store.
+
+    Keys are loaded lazily the first time a replica needs them and only keys
+    whose serialized form changed since the last load/flush are written back.
+    """
+
+    DIGESTS_KEY = "_persisted_digests"
+
+    def __init__(self, state, store, sid):
+        self.state = state
+        self.store = store
+        self.sid = sid
+        if self.DIGESTS_KEY not in state:
+            state[self.DIGESTS_KEY] = {}
+        self.digests = state[self.DIGESTS_KEY]
+
+    def hydrate(self, key, default):
+        """Ensure `key` is present, loading it from the store or calling `default()`."""
+        if key in self.state:
+            return self.state[key]
+        blob = self.store.load(self.sid, key)
+        value = None
+        if blob is not None:
+            try:
+                value = decode(blob)
+            except Exception:
+                # A corrupt row, or one pickled from a class that has since
+                # changed, must not break every rerun until the TTL runs out.
+                # Starting over from the default overwrites it on the next flush.
+                blob = None
+        if blob is None:
+            self.state[key] = default()
+            self.digests[key] = None
+        else:
+            self.state[key] = value
+            self.digests[key] = digest(blob)
+        return self.state[key]
+
+    def flush(self):
+        """Write back the hydrated keys whose contents changed; returns the keys written."""
+        dirty = {}
+        for key in list(self.digests):
+            if key not in self.state:
+                continue
+            blob = encode(self.state[key])
+            blob_digest = digest(blob)
+            if self.digests.get(key) != blob_digest:
+                dirty[key] = blob
+                self.digests[key] = blob_digest
+        if dirty:
+            self.store.save(self.sid, dirty)
+        return list(dirty)
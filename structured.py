@@ -0,0 +1,117 @@
+import json
+
+SWOT_QUADRANTS = ("strengths", "weaknesses", "opportunities", "threats")
+
+
+def _load(text):
+    """Parse a JSON reply, tolerating a markdown code fence around it."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"The model did not return valid JSON: {e}") from e
+
+
+def _strings(items):
+    return [str(item).strip() for item in items or [] if str(item).strip()]
+
+
+def parse_points(text):
+    """The list from a {"points": [...]} follow-up reply."""
+    return _strings(_load(text).get("points"))
+
+
+# --- Mind Maps ---
+class MindMap:
+    """A mind map held as parallel lists: node i is labels[i] under parents[i].
+
+    Node 0 is the topic. `expanded` holds the nodes whose children have been
+    fetched, so each node is asked for at most once per map.
+    """
+
+    def __init__(self, topic):
+        self.labels = [topic]
+        self.parents = [-1]
+        self.expanded = {0}
+
+    @classmethod
+    def from_json(cls, topic, text):
+        mind_map = cls(topic)
+        for branch in _load(text).get("branches") or []:
+            node = mind_map.add(branch.get("label", ""), 0)
+            if node is not None:
+                mind_map.add_children(node, branch.get("children"))
+        return mind_map
+
+    def add(self, label, parent):
+        label = str(label).strip()
+        if not label:
+            return None
+        self.labels.append(label)
+        self.parents.append(parent)
+        return len(self.labels) - 1
+
+    def add_children(self, node, labels):
+        known = {self.labels[child] for child in self.children(node)}
+        for label in _strings(labels):
+            if label not in known:
+                known.add(label)
+                self.add(label, node)
+        self.expanded.add(node)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def truncate(self, size):
+        """Keep the first `size` nodes; returns how many were dropped.
+
+        Parents always precede their children, so the kept nodes stay a tree.
+        Nodes that lost children can be expanded again.
+        """
+        dropped = len(self.labels) - size
+        if dropped <= 0:
+            return 0
+        cut_parents = set(self.parents[size:])
+        del self.labels[size:]
+        del self.parents[size:]
+        self.expanded = {node for node in self.expanded if node == 0 or (node < size and node not in cut_parents)}
+        return dropped
+
+    def children(self, node):
+        return [i for i, parent in enumerate(self.parents) if parent == node]
+
+    def path(self, node):
+        """Labels from the first branch down to `node`, e.g. "Soil > Compost"."""
+        labels = []
+        while node > 0:
+            labels.append(self.labels[node])
+            node = self.parents[node]
+        return " > ".join(reversed(labels))
+
+    def walk(self, node=0, depth=0):
+        """Yield (node, depth) in display order."""
+        yield node, depth
+        for child in self.children(node):
+            yield from self.walk(child, depth + 1)
+
+    def to_markdown(self):
+        return "\n".join(
+            f"# {self.labels[node]}" if depth == 0 else f"{'  ' * (depth - 1)}- {self.labels[node]}"
+            for node, depth in self.walk()
+        )
+
+
+# --- SWOT ---
+def parse_swot(text):
+    """{quadrant: [points]} for the four SWOT quadrants."""
+    data = _load(text)
+    return {quadrant: _strings(data.get(quadrant)) for quadrant in SWOT_QUADRANTS}
+
+
+def swot_markdown(swot):
+    return "\n\n".join(
+        f"### {quadrant.title()}\n" + "\n".join(f"- {point}" for point in points)
+        for quadrant, points in swot.items()
+    )
@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_gemini
+
+# Every test runs offline against the fake backends and throwaway stores.
+# This has to happen before tools/app modules are imported.
+fake_gemini.offline_environment()
+
+import pytest
+
+import tools
+
+
+@pytest.fixture(autouse=True)
+def fresh_tools():
+    """Give each test an empty tool cache, an unlimited rate limiter and a fresh fake model."""
+    tools.cache.clear()
+    tools.rate_limiter = tools.RateLimiter(10 ** 9)
+    tools._fake_model = fake_gemini.FakeGenerativeModel(tools.MODEL_NAME, seed=0)
+    tools.prewarmed = None
+    yield
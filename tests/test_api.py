@@ -0,0 +1,115 @@
+import datetime
+import email.utils
+import http.client
+import json
+import time
+
+import pytest
+
+import api
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = api.start_background("127.0.0.1", 0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("path", ["/api/tools", "/api/prompts", "/api/daily?difficulty=Easy"])
+def test_cacheable_routes_answer_conditional_requests(server, path):
+    status, headers, body = request(server, "GET", path)
+    assert status == 200
+    assert json.loads(body)
+    etag, last_modified = headers["ETag"], headers["Last-Modified"]
+
+    status, headers, body = request(server, "GET", path, headers={"If-None-Match": etag})
+    assert status == 304
+    assert body == b""
+    assert headers["ETag"] == etag
+
+    status, _, _ = request(server, "GET", path, headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert status == 304
+    status, _, _ = request(server, "GET", path, headers={"If-Modified-Since": last_modified})
+    assert status == 304
+    status, _, _ = request(server, "GET", path, headers={"If-None-Match": '"stale"', "If-Modified-Since": last_modified})
+    assert status == 200  # If-None-Match takes precedence over the date.
+
+
+def test_daily_rejects_unknown_difficulties(server):
+    status, _, body = request(server, "GET", "/api/daily?difficulty=Impossible")
+    assert status == 400
+    assert "difficulty" in json.loads(body)["error"]
+
+
+@pytest.mark.parametrize("top", ["x", "0", "-1"])
+def test_memory_rejects_a_bad_top(server, top):
+    status, _, _ = request(server, "GET", f"/api/memory?top={top}")
+    assert status == 400
+
+
+def test_metrics_are_prometheus_text(server):
+    status, headers, body = request(server, "GET", "/metrics")
+    assert status == 200
+    assert headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert b"# TYPE prompt_hub_tool_cache_total counter" in body
+
+
+def test_run_tool_requires_a_key(server):
+    status, _, _ = request(server, "POST", "/api/tools/eli5", body=json.dumps({"topic": "tides"}))
+    assert status == 401
+
+
+@pytest.mark.parametrize("body", ['{"topic": "tides", "extra": 1}', "[1, 2]", "not json"])
+def test_run_tool_rejects_bad_bodies(server, body):
+    status, _, _ = request(server, "POST", "/api/tools/eli5", body=body, headers={"X-Gemini-Api-Key": "key"})
+    assert status == 400
+
+
+def test_run_tool_returns_the_result(server):
+    status, _, body = request(
+        server, "POST", "/api/tools/eli5", body=json.dumps({"topic": "tides"}), headers={"X-Gemini-Api-Key": "key"}
+    )
+    assert status == 200
+    assert json.loads(body)["tool"] == "eli5"
+    assert json.loads(body)["result"]
+
+
+def test_unknown_tool_is_not_found(server):
+    status, _, _ = request(server, "POST", "/api/tools/nope", body="{}", headers={"X-Gemini-Api-Key": "key"})
+    assert status == 404
+
+
+def test_daily_sends_gmt_dates_from_a_non_utc_server(server, monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    monkeypatch.setattr(api, "CATALOG_MTIME", datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+    try:
+        status, headers, _ = request(server, "GET", "/api/daily?difficulty=All")
+        assert status == 200
+        last_modified = headers["Last-Modified"]
+        assert last_modified.endswith(" GMT")
+        # Local midnight in New York is 04:00 or 05:00 GMT.
+        assert email.utils.parsedate_to_datetime(last_modified).hour in (4, 5)
+        status, _, _ = request(server, "GET", "/api/daily?difficulty=All", headers={"If-Modified-Since": last_modified})
+        assert status == 304
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_tools_listing_marks_shared_tools(server):
+    listing = json.loads(request(server, "GET", "/api/tools")[2])
+    assert listing["eli5"]["shared"] is True
+    assert listing["gamer_tags"]["shared"] is False
@@ -0,0 +1,106 @@
+import io
+import json
+
+import pytest
+
+import batch
+import tools
+
+
+def read_output(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest.fixture
+def rows():
+    return [{"topic": f"topic {i}"} for i in range(6)]
+
+
+def test_run_batch_writes_one_line_per_row(tmp_path, rows):
+    output = tmp_path / "out.jsonl"
+    summary = batch.run_batch("key", "eli5", rows, str(output), concurrency=2)
+    assert summary == {"completed": 6, "failed": 0, "skipped": 0}
+    records = read_output(output)
+    assert sorted(record["index"] for record in records) == list(range(6))
+    assert all(record["result"] for record in records)
+
+
+def test_rerun_skips_completed_rows_and_retries_failures(tmp_path, rows, monkeypatch):
+    output = tmp_path / "out.jsonl"
+    run_tool = tools.run_tool
+
+    def flaky(api_key, tool_id, **fields):
+        if fields["topic"] in ("topic 1", "topic 4"):
+            raise RuntimeError("upstream unavailable")
+        return run_tool(api_key, tool_id, **fields)
+
+    monkeypatch.setattr(tools, "run_tool", flaky)
+    first = batch.run_batch("key", "eli5", rows, str(output), retries=0)
+    assert first == {"completed": 4, "failed": 2, "skipped": 0}
+
+    monkeypatch.setattr(tools, "run_tool", run_tool)
+    second = batch.run_batch("key", "eli5", rows, str(output), retries=0)
+    assert second == {"completed": 2, "failed": 0, "skipped": 4}
+    assert batch.completed_indices(str(output)) == set(range(6))
+
+
+def test_retries_recover_from_transient_errors(tmp_path, monkeypatch):
+    attempts = []
+
+    def flaky(api_key, tool_id, **fields):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("try again")
+        return "ok"
+
+    monkeypatch.setattr(tools, "run_tool", flaky)
+    output = tmp_path / "out.jsonl"
+    summary = batch.run_batch("key", "eli5", [{"topic": "x"}], str(output), retries=3, backoff=0)
+    assert summary["completed"] == 1
+    assert read_output(output)[0]["result"] == "ok"
+
+
+def test_completed_indices_ignores_failures_and_truncated_lines(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        '{"index": 0, "input": {}, "result": "a"}\n'
+        '{"index": 1, "input": {}, "error": "RuntimeError: boom"}\n'
+        '{"index": 2, "inp',
+        encoding="utf-8",
+    )
+    assert batch.completed_indices(str(output)) == {0}
+
+
+def test_read_inputs_accepts_csv_with_a_byte_order_mark():
+    fp = io.TextIOWrapper(io.BytesIO("\ufefftopic\ntides\n".encode("utf-8")), encoding="utf-8-sig", newline="")
+    assert list(batch.read_inputs(fp, "csv")) == [{"topic": "tides"}]
+
+
+def test_read_inputs_skips_blank_jsonl_lines():
+    fp = io.StringIO('{"topic": "tides"}\n\n{"topic": "volcanoes"}\n')
+    assert list(batch.read_inputs(fp, batch.input_format("rows.jsonl"))) == [{"topic": "tides"}, {"topic": "volcanoes"}]
+
+
+def test_only_the_tools_fields_are_passed_on(tmp_path, monkeypatch):
+    seen = []
+
+    def record(api_key, tool_id, **fields):
+        seen.append(fields)
+        return "ok"
+
+    monkeypatch.setattr(tools, "run_tool", record)
+    fp = io.StringIO("topic,notes,images\ntides,extra,1,overflow\n")
+    summary = batch.run_batch("key", "eli5", batch.read_inputs(fp, "csv"), str(tmp_path / "out.jsonl"))
+    assert summary["completed"] == 1
+    assert seen == [{"topic": "tides"}]
+
+
+@pytest.mark.parametrize("row", [["tides"], "tides", {"topic": None}, {"api_key": "x"}])
+def test_bad_rows_fail_without_retries(tmp_path, monkeypatch, row):
+    calls = []
+    monkeypatch.setattr(batch.time, "sleep", lambda seconds: calls.append(seconds))
+    output = tmp_path / "out.jsonl"
+    summary = batch.run_batch("key", "eli5", [row], str(output), retries=3)
+    assert summary == {"completed": 0, "failed": 1, "skipped": 0}
+    assert calls == []
+    assert "Error" in read_output(output)[0]["error"]
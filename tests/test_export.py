@@ -0,0 +1,123 @@
+import http.client
+import io
+import json
+import time
+import zipfile
+
+import pytest
+
+import api
+import export
+import session_memory
+import session_store
+
+SID = "session-1"
+IMAGE = b"\x89PNG fake image bytes"
+
+
+@pytest.fixture
+def stores(tmp_path):
+    store = session_store.MemoryStore()
+    generations = export.GenerationStore(str(tmp_path / "generations.db"))
+    blobs = session_memory.BlobStore()
+    history = {"2024-03-04": [{"prompt": "Draw a fox", "level": "Easy"}]}
+    gallery = [session_memory.gallery_item("A fox", "Lovely", IMAGE, blobs)]
+    store.save(SID, {"prompt_history": session_store.encode(history), "gallery": session_store.encode(gallery)})
+    generations.save(SID, "eli5", {"topic": "tides"}, "Once upon a time")
+    generations.save("someone-else", "eli5", {"topic": "rain"}, "It was raining")
+    return store, generations
+
+
+def jsonl_records(chunks):
+    return [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+
+
+def test_zip_export_is_a_valid_archive(stores):
+    store, generations = stores
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(export.stream_export(SID, store, generations))))
+    assert archive.testzip() is None
+    assert sorted(archive.namelist()) == [
+        "gallery/00000.img",
+        "gallery/part-0000.jsonl",
+        "generation/part-0000.jsonl",
+        "history/part-0000.jsonl",
+    ]
+    assert archive.read("gallery/00000.img") == IMAGE
+    generation = json.loads(archive.read("generation/part-0000.jsonl"))
+    assert generation["result"] == "Once upon a time"
+
+
+def test_zip_splits_records_into_parts():
+    records = (("generation", {"id": i}, None) for i in range(5))
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(export.stream_zip(records, part_size=2))))
+    assert archive.testzip() is None
+    assert sorted(archive.namelist()) == [f"generation/part-{i:04d}.jsonl" for i in range(3)]
+    assert archive.read("generation/part-0002.jsonl") == b'{"id": 4}\n'
+
+
+def test_jsonl_export_inlines_images(stores):
+    store, generations = stores
+    records = jsonl_records(export.stream_export(SID, store, generations, fmt="jsonl"))
+    assert [record["type"] for record in records] == ["history", "gallery", "generation"]
+    assert "image_base64" in records[1]
+
+
+def test_incremental_export_only_contains_new_generations(stores):
+    store, generations = stores
+    list(export.stream_export(SID, store, generations, fmt="jsonl"))
+    generations.save(SID, "eli5", {"topic": "volcanoes"}, "In the beginning")
+
+    records = jsonl_records(export.stream_export(SID, store, generations, fmt="jsonl", incremental=True))
+    assert [record["result"] for record in records if record["type"] == "generation"] == ["In the beginning"]
+    assert not [record for record in records if record["type"] == "gallery"]
+    # The last exported day is repeated, since it may still have been growing.
+    assert [record["prompt"] for record in records if record["type"] == "history"] == ["Draw a fox"]
+
+
+def test_abandoned_export_does_not_advance_the_cursor(stores):
+    store, generations = stores
+    chunks = export.stream_export(SID, store, generations, fmt="jsonl")
+    next(chunks)
+    chunks.close()
+    assert generations.get_cursor(SID) == {}
+
+    list(export.stream_export(SID, store, generations, fmt="jsonl"))
+    assert generations.get_cursor(SID)["generation_id"] == 1
+
+
+def test_unknown_format_is_rejected(stores):
+    store, generations = stores
+    with pytest.raises(ValueError):
+        list(export.stream_export(SID, store, generations, fmt="tar"))
+
+
+def test_tokens_resolve_to_their_session_until_they_expire(tmp_path):
+    generations = export.GenerationStore(str(tmp_path / "generations.db"))
+    token, expires_at = generations.issue_token(SID)
+    assert expires_at > time.time()
+    assert generations.redeem_token(token) == SID
+    assert generations.redeem_token("made-up") is None
+
+    expired, _ = generations.issue_token(SID, ttl=-1)
+    assert generations.redeem_token(expired) is None
+
+
+def test_the_api_streams_an_export_for_a_token(stores, monkeypatch):
+    monkeypatch.setattr(api, "_stores", stores)
+    server = api.start_background("127.0.0.1", 0)
+    try:
+        token, _ = stores[1].issue_token(SID)
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+        conn.request("GET", f"/api/export?token={token}&format=zip")
+        response = conn.getresponse()
+        assert response.status == 200
+        assert zipfile.ZipFile(io.BytesIO(response.read())).testzip() is None
+        conn.close()
+
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+        conn.request("GET", "/api/export?token=made-up")
+        assert conn.getresponse().status == 403
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+import fake_gemini
+import tools
+
+
+def test_offline_environment_points_the_app_at_the_fakes():
+    assert os.environ["GEMINI_BACKEND"] == "fake"
+    assert os.environ["SESSION_STORE_URL"] == "memory://"
+    assert isinstance(tools.get_model("unused"), fake_gemini.FakeGenerativeModel)
+
+
+def test_offline_environment_keeps_existing_values(tmp_path, monkeypatch):
+    monkeypatch.setenv("GENERATIONS_DB", "mine.db")
+    monkeypatch.delenv("WARMUP_DB")
+    assert fake_gemini.offline_environment(str(tmp_path)) == str(tmp_path)
+    assert os.environ["GENERATIONS_DB"] == "mine.db"
+    assert os.environ["WARMUP_DB"] == str(tmp_path / "warmup.db")
+
+
+def test_output_depends_only_on_the_prompt():
+    model = fake_gemini.FakeGenerativeModel(words=8)
+    other = fake_gemini.FakeGenerativeModel(words=8, seed=1)
+    assert model.generate_content("a fox").text == other.generate_content("a fox").text
+    assert model.generate_content("a fox").text != model.generate_content("a hen").text
+    assert model.calls == 3
+
+
+def test_streaming_yields_the_same_text_in_chunks():
+    model = fake_gemini.FakeGenerativeModel(words=40)
+    response = model.generate_content("a fox", stream=True)
+    chunks = [chunk.text for chunk in response]
+    assert len(chunks) > 1
+    assert "".join(chunks) == model.generate_content("a fox").text
+
+
+def test_schema_requests_get_matching_json():
+    model = fake_gemini.FakeGenerativeModel()
+    config = {"response_mime_type": "application/json", "response_schema": tools.SWOT_SCHEMA}
+    reply = json.loads(model.generate_content("a bakery", generation_config=config).text)
+    assert set(reply) == set(tools.SWOT_SCHEMA["properties"])
+    assert all(isinstance(points, list) and points for points in reply.values())
+
+
+def test_simulated_errors_follow_the_weights():
+    model = fake_gemini.FakeGenerativeModel(error_rate=1, errors={"quota": 1})
+    with pytest.raises(Exception, match="Simulated quota error"):
+        model.generate_content("a fox")
+    assert fake_gemini._parse_weights("quota:3, unavailable") == {"quota": 3.0, "unavailable": 1.0}
+
+
+def test_fake_tts_writes_an_mp3_frame():
+    assert tools.synthesize_speech("hello").read() == fake_gemini.SILENT_MP3_FRAME
@@ -0,0 +1,119 @@
+import datetime
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from gamification import BadgeEngine
+
+DAY = datetime.date(2024, 3, 4)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return BadgeEngine(str(tmp_path / "gamification.db"), str(tmp_path / "activity_log.jsonl"))
+
+
+def days(*offsets):
+    return [DAY + datetime.timedelta(days=offset) for offset in offsets]
+
+
+def test_consecutive_days_build_a_streak(engine):
+    for day in days(0, 1, 2):
+        engine.record_completion("ada", when=day)
+    stats = engine.stats("ada", today=DAY + datetime.timedelta(days=2))
+    assert stats["completed"] == 3
+    assert stats["streak"] == stats["best_streak"] == 3
+
+
+def test_same_day_completions_do_not_extend_the_streak(engine):
+    for day in days(0, 0, 1, 1):
+        engine.record_completion("ada", when=day)
+    stats = engine.stats("ada", today=DAY + datetime.timedelta(days=1))
+    assert stats["completed"] == 4
+    assert stats["streak"] == 2
+
+
+def test_a_gap_resets_the_streak_but_keeps_the_best(engine):
+    for day in days(0, 1, 2, 5):
+        engine.record_completion("ada", when=day)
+    stats = engine.stats("ada", today=DAY + datetime.timedelta(days=5))
+    assert stats["streak"] == 1
+    assert stats["best_streak"] == 3
+
+
+def test_a_missed_day_reads_as_no_streak(engine):
+    for day in days(0, 1):
+        engine.record_completion("ada", when=day)
+    assert engine.stats("ada", today=DAY + datetime.timedelta(days=2))["streak"] == 2
+    assert engine.stats("ada", today=DAY + datetime.timedelta(days=3))["streak"] == 0
+
+
+def test_badges_are_awarded_once(engine):
+    awarded = [engine.record_completion("ada", when=day) for day in days(0, 1, 2, 3, 4, 5, 6, 7, 8, 9)]
+    assert awarded[4] == ["5-Day Streak"]
+    assert awarded[9] == ["10 Prompts Completed"]
+    assert sum(len(badges) for badges in awarded) == 2
+    assert engine.stats("ada", today=DAY)["badges"] == ["5-Day Streak", "10 Prompts Completed"]
+    assert engine.global_stats() == {"total_users": 1, "total_completions": 10, "total_badges": 2}
+
+
+def test_rebuild_matches_the_incremental_aggregates(engine):
+    for user, offsets in {"ada": (0, 1, 2, 3, 4, 8), "bob": (0, 2, 3), "cy": (1,)}.items():
+        for day in days(*offsets):
+            engine.record_completion(user, when=day)
+    today = DAY + datetime.timedelta(days=8)
+    before = {user: engine.stats(user, today) for user in ("ada", "bob", "cy")}
+    board = engine.leaderboard(by="streak")
+    totals = engine.global_stats()
+
+    assert engine.rebuild() == 10
+    assert {user: engine.stats(user, today) for user in ("ada", "bob", "cy")} == before
+    assert engine.leaderboard(by="streak") == board
+    assert engine.global_stats() == totals
+
+
+def test_leaderboard_orders_by_the_requested_column(engine):
+    for day in days(0, 1, 2):
+        engine.record_completion("streaky", when=day)
+    for day in days(0, 0, 0, 0):
+        engine.record_completion("busy", when=day)
+    assert [row["user_id"] for row in engine.leaderboard()] == ["busy", "streaky"]
+    assert [row["user_id"] for row in engine.leaderboard(by="streak")] == ["streaky", "busy"]
+
+
+def test_the_display_name_is_only_a_label(engine):
+    engine.record_completion("guest-1", when=DAY, display_name="Ada")
+    engine.record_completion("guest-2", when=DAY, display_name="Ada")
+    engine.record_completion("guest-2", when=DAY)
+    board = engine.leaderboard()
+    assert [(row["user_id"], row["display_name"], row["completed"]) for row in board] == [
+        ("guest-2", "Ada", 2),
+        ("guest-1", "Ada", 1),
+    ]
+    engine.rebuild()
+    assert engine.leaderboard() == board
+
+
+def test_unnamed_users_are_listed_by_id(engine):
+    engine.record_completion("guest-1", when=DAY)
+    assert engine.leaderboard()[0]["display_name"] == "guest-1"
+
+
+def test_the_log_line_is_written_under_the_replica_write_lock(tmp_path):
+    db_path, log_path = str(tmp_path / "gamification.db"), tmp_path / "activity_log.jsonl"
+    writer = BadgeEngine(db_path, str(log_path))
+    other = sqlite3.connect(db_path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # Another replica mid-rebuild().
+
+    thread = threading.Thread(target=writer.record_completion, args=("ada",), kwargs={"when": DAY})
+    thread.start()
+    time.sleep(0.2)
+    assert not log_path.exists() or log_path.read_text() == ""
+    other.execute("COMMIT")
+    thread.join(timeout=10)
+
+    assert len(log_path.read_text().splitlines()) == 1
+    assert BadgeEngine(db_path, str(log_path)).rebuild() == 1
+    assert writer.stats("ada", today=DAY)["completed"] == 1
@@ -0,0 +1,69 @@
+import pytest
+
+import fake_gemini
+import metrics
+import tools
+
+
+def value(metric, **labels):
+    return metric._values.get(metric._key(labels), 0)
+
+
+def test_render_uses_the_prometheus_text_format():
+    counter = metrics.Counter("test_render_total", 'A "quoted"\nhelp', ("kind",))
+    histogram = metrics.Histogram("test_render_seconds", "Latency.", buckets=(0.1, 1))
+    try:
+        counter.inc(kind='a"b')
+        histogram.observe(0.5)
+        histogram.observe(5)
+        text = metrics.render()
+    finally:
+        metrics.REGISTRY.remove(counter)
+        metrics.REGISTRY.remove(histogram)
+    assert '# TYPE test_render_total counter\ntest_render_total{kind="a\\"b"} 1.0\n' in text
+    assert 'test_render_seconds_bucket{le="0.1"} 0\n' in text
+    assert 'test_render_seconds_bucket{le="1.0"} 1\n' in text
+    assert 'test_render_seconds_bucket{le="+Inf"} 2\n' in text
+    assert "test_render_seconds_sum 5.5\ntest_render_seconds_count 2\n" in text
+    assert text.endswith("\n")
+
+
+def test_cache_outcomes_are_counted():
+    misses, hits = value(metrics.tool_cache_total, tool="eli5", result="miss"), value(metrics.tool_cache_total, tool="eli5", result="hit")
+    tools.run_tool("key", "eli5", topic="metrics")
+    tools.run_tool("key", "eli5", topic="metrics")
+    assert value(metrics.tool_cache_total, tool="eli5", result="miss") == misses + 1
+    assert value(metrics.tool_cache_total, tool="eli5", result="hit") == hits + 1
+
+
+def test_warm_store_hits_are_counted():
+    class Warm:
+        def get(self, tool_id, prompt):
+            return "warmed"
+
+    tools.prewarmed = Warm()
+    warm = value(metrics.tool_cache_total, tool="eli5", result="warm")
+    assert tools.run_tool("key", "eli5", topic="warm metrics") == "warmed"
+    assert value(metrics.tool_cache_total, tool="eli5", result="warm") == warm + 1
+
+
+def test_model_calls_are_timed_and_failures_counted_once():
+    def observations():
+        counts, _ = metrics.generate_content_seconds._values.get(("eli5", tools.MODEL_NAME), ([], 0))
+        return sum(counts)
+
+    before = observations()
+    tools.run_tool("key", "eli5", topic="timed")
+    assert observations() == before + 1
+
+    tools._fake_model = fake_gemini.FakeGenerativeModel(tools.MODEL_NAME, error_rate=1, errors={"unavailable": 1})
+    before = sum(metrics.errors_total._values.values())
+    with pytest.raises(Exception):
+        tools.run_tool("key", "eli5", topic="failing")
+    assert sum(metrics.errors_total._values.values()) == before + 1
+
+
+def test_active_sessions_expire_after_the_window():
+    metrics.touch_session("test-session")
+    assert metrics.active_sessions() >= 1
+    assert metrics.active_sessions(window=-1) == 0
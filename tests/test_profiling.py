@@ -0,0 +1,42 @@
+import os
+
+import profiling
+
+
+def test_the_query_parameter_needs_the_operator_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "")
+    assert not profiling.requested("1")
+    assert not profiling.requested("")
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    assert profiling.requested("s3cret")
+    assert not profiling.requested("1")
+    assert not profiling.requested("sécret")
+    assert not profiling.requested(None)
+
+
+def test_sections_add_up_to_the_run():
+    profiler = profiling.start(True)
+    profiler.checkpoint("first")
+    with profiler.section("tool: eli5"):
+        pass
+    profiler.checkpoint("second")
+    profiler.stop()
+    assert [name for name, _ in profiler.sections] == ["first", "second"]
+    assert [name for name, _ in profiler.nested] == ["tool: eli5"]
+    assert sum(ms for _, ms in profiler.sections) <= profiler.total_ms
+    assert profiling.start(False) is profiling.current()
+    assert not profiling.current().enabled
+
+
+def test_only_the_newest_captures_are_kept(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"rerun-old-{i}.prof"
+        path.write_bytes(b"")
+        os.utime(path, (i, i))
+    (tmp_path / "notes.txt").write_text("keep me")
+
+    profiler = profiling.RerunProfiler(capture="cprofile")
+    profiler.stop()
+    dumped = profiler.dump(str(tmp_path), keep=3)
+
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(dumped), "notes.txt", "rerun-old-3.prof", "rerun-old-4.prof"])
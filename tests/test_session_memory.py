@@ -0,0 +1,78 @@
+import pytest
+
+import session_memory
+from structured import MindMap
+
+CAPS = {
+    "prompt_history_days": 2,
+    "prompt_history_per_day": 3,
+    "gallery": 2,
+    "story": 3,
+    "mind_map_nodes": 3,
+    "swot_points": 2,
+}
+
+
+def test_remember_prompt_records_each_prompt_once():
+    history = {}
+    for _ in range(3):
+        session_memory.remember_prompt(history, "2024-03-04", {"prompt": "Draw a fox"})
+    assert history == {"2024-03-04": [{"prompt": "Draw a fox"}]}
+
+
+def test_enforce_caps_drops_the_oldest_history():
+    history = {f"2024-03-0{day}": [f"p{day}-{i}" for i in range(5)] for day in (1, 2, 3)}
+    state = {"prompt_history": history}
+    assert session_memory.enforce_caps(state, CAPS) == {"prompt_history": 5 + 2 + 2}
+    assert history == {"2024-03-02": ["p2-2", "p2-3", "p2-4"], "2024-03-03": ["p3-2", "p3-3", "p3-4"]}
+
+
+def test_enforce_caps_keeps_the_newest_gallery_items_and_the_story_opening():
+    state = {"gallery": ["g1", "g2", "g3", "g4"], "story": ["opening", "a", "b", "c", "d"]}
+    assert session_memory.enforce_caps(state, CAPS) == {"gallery": 2, "story": 2}
+    assert state["gallery"] == ["g3", "g4"]
+    assert state["story"] == ["opening", "c", "d"]
+
+
+def test_enforce_caps_trims_mind_maps_and_swot_quadrants():
+    mind_map = MindMap("Gardening")
+    soil = mind_map.add("Soil", 0)
+    mind_map.add_children(soil, ["Compost", "Mulch", "pH"])
+    swot = {"subject": "A bakery", "quadrants": {"strengths": ["a", "b", "c"], "threats": ["x"]}}
+    state = {"mind_map": mind_map, "swot": swot}
+    assert session_memory.enforce_caps(state, CAPS) == {"mind_map": 2, "swot": 1}
+    assert mind_map.labels == ["Gardening", "Soil", "Compost"]
+    assert swot["quadrants"] == {"strengths": ["a", "b"], "threats": ["x"]}
+
+
+def test_enforce_caps_leaves_small_state_alone():
+    state = {"prompt_history": {"2024-03-04": ["p"]}, "gallery": [], "story": ["opening"], "mind_map": None, "swot": None}
+    assert session_memory.enforce_caps(state, CAPS) == {}
+
+
+def test_memory_report_skips_missing_values():
+    mind_map = MindMap("Gardening")
+    report = session_memory.memory_report({"story": ["a", "b"], "mind_map": mind_map, "swot": None})
+    assert set(report) == {"story", "mind_map"}
+    assert report["story"]["entries"] == 2
+    assert report["mind_map"]["bytes"] > session_memory.deep_sizeof([])
+
+
+def test_blob_store_deduplicates_images(tmp_path):
+    blobs = session_memory.BlobStore(str(tmp_path / "blobs"))
+    first = session_memory.gallery_item("A fox", "Lovely", b"image", blobs)
+    second = session_memory.gallery_item("Another fox", "Nice", b"image", blobs)
+    assert first["image_ref"] == second["image_ref"]
+    assert session_memory.gallery_image(first, blobs) == b"image"
+    assert session_memory.gallery_image({"image": b"inline"}, blobs) == b"inline"
+
+
+@pytest.mark.parametrize("cap", [1, 2, 3, 4, 5, 200])
+@pytest.mark.parametrize("length", range(1, 12))
+def test_story_trimming_keeps_whose_turn_it_is(cap, length):
+    story = ["opening"] + [f"{'ai' if i % 2 else 'user'}-{i}" for i in range(1, length)]
+    session_memory.enforce_caps({"story": story}, dict(CAPS, story=cap))
+    assert len(story) % 2 == length % 2
+    assert len(story) <= max(cap, 2 - length % 2)
+    assert story[0] == "opening"
+    assert all(part.startswith("ai") == (i % 2 == 1) for i, part in enumerate(story[1:], 1))
@@ -0,0 +1,95 @@
+import pytest
+
+import session_store
+from session_store import MemoryStore, PersistedState, SQLiteStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore()
+    return SQLiteStore(str(tmp_path / "sessions.db"))
+
+
+def test_encode_decode_roundtrip():
+    value = {"2024-03-04": [{"prompt": "Draw a fox", "category": "🎨 Drawing"}], "n": (1, 2)}
+    assert session_store.decode(session_store.encode(value)) == value
+
+
+def test_hydrate_uses_the_default_when_nothing_is_stored(store):
+    persisted = PersistedState({}, store, "sid")
+    assert persisted.hydrate("story", list) == []
+    assert persisted.hydrate("story", lambda: ["ignored"]) == []
+
+
+def test_flush_writes_only_changed_keys(store):
+    state = {}
+    persisted = PersistedState(state, store, "sid")
+    persisted.hydrate("story", list)
+    persisted.hydrate("gallery", list)
+    persisted.hydrate("mind_map", lambda: None)
+    state["story"].append("Once upon a time")
+
+    assert sorted(persisted.flush()) == ["gallery", "mind_map", "story"]  # New keys are written once.
+    assert persisted.flush() == []
+
+    state["story"].append("there was a fox")
+    assert persisted.flush() == ["story"]
+    assert persisted.flush() == []
+
+
+def test_unhydrated_keys_are_not_written(store):
+    state = {"unrelated": 1}
+    persisted = PersistedState(state, store, "sid")
+    assert persisted.flush() == []
+    assert store.load("sid", "unrelated") is None
+
+
+def test_another_replica_loads_the_flushed_state(store):
+    first = {}
+    persisted = PersistedState(first, store, "sid")
+    persisted.hydrate("story", list).append("Once upon a time")
+    persisted.flush()
+
+    second = {}
+    replica = PersistedState(second, store, "sid")
+    assert replica.hydrate("story", list) == ["Once upon a time"]
+    assert replica.flush() == []  # Loaded, unchanged: nothing to write back.
+    assert PersistedState({}, store, "other").hydrate("story", list) == []
+
+
+def test_sqlite_store_expires_idle_sessions(tmp_path):
+    store = SQLiteStore(str(tmp_path / "sessions.db"))
+    store.save("sid", {"story": session_store.encode(["a"])})
+    assert store.expire() == 0
+    assert session_store.decode(store.load("sid", "story")) == ["a"]
+
+    store.ttl = -1
+    assert store.expire() == 1
+    store.ttl = 3600
+    assert store.load("sid", "story") is None
+
+
+def test_open_store_rejects_unknown_urls():
+    assert isinstance(session_store.open_store("memory://"), MemoryStore)
+    with pytest.raises(ValueError):
+        session_store.open_store("ftp://example.com")
+
+
+@pytest.mark.parametrize("blob", [b"not a pickle", session_store.encode(None)[:-4]])
+def test_undecodable_rows_fall_back_to_the_default(store, blob):
+    store.save("sid", {"story": blob})
+    state = {}
+    persisted = PersistedState(state, store, "sid")
+    assert persisted.hydrate("story", list) == []
+    assert persisted.flush() == ["story"]  # The bad row is replaced.
+    assert session_store.decode(store.load("sid", "story")) == []
+
+
+def test_saving_prunes_expired_sessions(tmp_path):
+    store = SQLiteStore(str(tmp_path / "sessions.db"), prune_interval=0)
+    store.save("old", {"story": session_store.encode(["a"])})
+    with store._conn:
+        store._conn.execute("UPDATE session_state SET updated_at = updated_at - ?", (store.ttl + 1,))
+    store.save("new", {"story": session_store.encode(["b"])})
+    assert store._conn.execute("SELECT sid FROM session_state").fetchall() == [("new",)]
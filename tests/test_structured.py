@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import structured
+import tools
+from structured import MindMap
+
+MIND_MAP_REPLY = json.dumps({
+    "branches": [
+        {"label": "Soil", "children": ["Compost", "pH", "Compost", " "]},
+        {"label": "Water", "children": ["Drip lines"]},
+        {"label": " ", "children": ["Orphan"]},
+    ]
+})
+
+
+def test_mind_map_from_json_builds_the_tree():
+    mind_map = MindMap.from_json("Gardening", MIND_MAP_REPLY)
+    assert mind_map.labels == ["Gardening", "Soil", "Compost", "pH", "Water", "Drip lines"]
+    assert mind_map.children(0) == [1, 4]
+    assert mind_map.path(2) == "Soil > Compost"
+    assert mind_map.path(0) == ""
+    assert mind_map.expanded == {0, 1, 4}
+    assert mind_map.to_markdown() == "# Gardening\n- Soil\n  - Compost\n  - pH\n- Water\n  - Drip lines"
+
+
+def test_code_fenced_json_is_accepted():
+    assert structured.parse_points('```json\n{"points": ["a", " b ", ""]}\n```') == ["a", "b"]
+
+
+def test_invalid_json_raises_value_error():
+    with pytest.raises(ValueError, match="valid JSON"):
+        structured.parse_points("Sure! Here are some points: ...")
+
+
+def test_add_children_skips_known_labels():
+    mind_map = MindMap("Gardening")
+    soil = mind_map.add("Soil", 0)
+    mind_map.add_children(soil, ["Compost"])
+    mind_map.add_children(soil, ["Compost", "Mulch"])
+    assert [mind_map.labels[child] for child in mind_map.children(soil)] == ["Compost", "Mulch"]
+    assert soil in mind_map.expanded
+
+
+def test_truncate_keeps_a_tree_and_reopens_cut_parents():
+    mind_map = MindMap.from_json("Gardening", MIND_MAP_REPLY)
+    assert mind_map.truncate(5) == 1
+    assert len(mind_map) == 5
+    assert mind_map.expanded == {0, 1}  # Water lost its child, so it can be expanded again.
+    assert all(parent < node for node, parent in enumerate(mind_map.parents) if node)
+    assert mind_map.truncate(10) == 0
+
+
+def test_parse_swot_fills_every_quadrant():
+    swot = structured.parse_swot('{"strengths": ["Cheap"], "threats": ["Rivals", ""]}')
+    assert swot == {"strengths": ["Cheap"], "weaknesses": [], "opportunities": [], "threats": ["Rivals"]}
+    assert structured.swot_markdown(swot).startswith("### Strengths\n- Cheap")
+
+
+def test_structured_tools_return_parseable_json():
+    mind_map = MindMap.from_json("Gardening", tools.run_tool("key", "mind_map", topic="Gardening"))
+    assert len(mind_map) > 1
+    swot = structured.parse_swot(tools.run_tool("key", "swot", subject="A bakery"))
+    assert set(swot) == set(structured.SWOT_QUADRANTS)
+    points = structured.parse_points(
+        tools.run_tool("key", "swot_expand", subject="A bakery", quadrant="threats", existing="(none yet)")
+    )
+    assert points
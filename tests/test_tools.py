@@ -0,0 +1,68 @@
+import io
+
+import pytest
+from PIL import Image
+
+import tools
+
+
+def png(color):
+    out = io.BytesIO()
+    Image.new("RGB", (4, 4), color).save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_repeated_requests_are_served_from_the_cache():
+    first = tools.run_tool("key", "eli5", topic="tides")
+    assert tools.run_tool("key", "eli5", topic="tides") == first
+    assert tools._fake_model.calls == 1
+
+
+def test_fresh_requests_skip_the_cache():
+    tools.cache.put(tools._cache_key("key", "eli5", tools.build_prompt("eli5", topic="tides"), ()), "stale")
+    assert tools.run_tool("key", "eli5", topic="tides") == "stale"
+    assert tools.run_tool("key", "eli5", fresh=True, topic="tides") != "stale"
+    assert tools.run_tool("key", "eli5", topic="tides") != "stale"  # The fresh result replaces the entry.
+    assert tools._fake_model.calls == 1
+
+
+def test_shared_tools_are_cached_for_every_key():
+    assert tools.TOOLS["eli5"].get("shared")
+    tools.run_tool("alice", "eli5", topic="tides")
+    tools.run_tool("bob", "eli5", topic="tides")
+    assert tools._fake_model.calls == 1
+
+
+def test_other_tools_are_cached_per_key():
+    assert not tools.TOOLS["gamer_tags"].get("shared")
+    tools.run_tool("alice", "gamer_tags", theme="space")
+    tools.run_tool("alice", "gamer_tags", theme="space")
+    assert tools._fake_model.calls == 1
+    tools.run_tool("made-up", "gamer_tags", theme="space")
+    assert tools._fake_model.calls == 2
+
+
+def test_images_are_part_of_the_cache_key():
+    tools.run_tool("key", "feedback", work="A fox")
+    tools.run_tool("key", "feedback", images=[png("red")], work="A fox")
+    tools.run_tool("key", "feedback", images=[png("red")], work="A fox")
+    tools.run_tool("key", "feedback", images=[png("blue")], work="A fox")
+    assert tools._fake_model.calls == 3
+
+
+def test_rate_limit_applies_to_model_calls_only():
+    tools.rate_limiter = tools.RateLimiter(1)
+    tools.run_tool("key", "eli5", topic="tides")
+    tools.run_tool("key", "eli5", topic="tides")
+    with pytest.raises(tools.RateLimitError) as raised:
+        tools.run_tool("key", "eli5", topic="volcanoes")
+    assert raised.value.retry_after > 0
+    with pytest.raises(tools.RateLimitError):
+        tools.run_tool("key", "eli5", fresh=True, topic="tides")
+
+
+def test_missing_fields_are_rejected():
+    with pytest.raises(ValueError, match="topic"):
+        tools.run_tool("key", "eli5", topic="  ")
+    with pytest.raises(KeyError):
+        tools.run_tool("key", "nope")
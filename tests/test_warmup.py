@@ -0,0 +1,77 @@
+import datetime
+import importlib
+
+import pytest
+
+import catalog
+import fake_gemini
+import tools
+import warmup
+
+ROLLOVER = datetime.date(2024, 3, 11)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return warmup.WarmStore(str(tmp_path / "warmup.db"))
+
+
+def test_next_rollover_is_the_following_monday():
+    assert warmup.next_rollover(datetime.date(2024, 3, 6)) == ROLLOVER
+    assert warmup.next_rollover(ROLLOVER) == ROLLOVER + datetime.timedelta(days=7)
+
+
+def test_warmed_results_are_served_by_run_tool(store):
+    theme = catalog.weekly_theme(datetime.date.today())
+    summary = warmup.warm("key", theme, ROLLOVER, store, budget=10 ** 9)
+    assert summary["generated"] == len(warmup.plan(theme))
+    tool_id, fields, prompt = warmup.plan(theme)[0]
+
+    tools.prewarmed = store
+    calls = tools._fake_model.calls
+    assert tools.run_tool("key", tool_id, **fields) == store.get(tool_id, prompt)
+    assert tools._fake_model.calls == calls
+
+
+def test_fresh_results_are_skipped(store):
+    warmup.warm("key", "Fantasy Realms", ROLLOVER, store, budget=10 ** 9)
+    summary = warmup.warm("key", "Fantasy Realms", ROLLOVER, store, budget=10 ** 9)
+    assert summary["generated"] == 0
+    assert summary["skipped"] == len(warmup.plan("Fantasy Realms"))
+
+
+def test_the_budget_is_shared_across_runs_for_a_rollover(store):
+    tools._fake_model = fake_gemini.FakeGenerativeModel(tools.MODEL_NAME, error_rate=1, errors={"unavailable": 1})
+    budget = warmup.estimate_tokens(warmup.plan("Fantasy Realms")[0][2]) + 1
+    first = warmup.warm("key", "Fantasy Realms", ROLLOVER, store, budget=budget)
+    assert first["failed"] == 2  # Failed calls are charged too.
+    assert store.spent("Fantasy Realms", ROLLOVER) >= budget
+
+    again = warmup.warm("key", "Fantasy Realms", ROLLOVER, store, budget=budget)
+    assert again == {"generated": 0, "skipped": 0, "failed": 0, "tokens": 0}
+    assert warmup.warm("key", "Fantasy Realms", ROLLOVER + datetime.timedelta(days=7), store, budget=budget)["failed"] == 2
+
+
+def test_warmed_results_are_only_served_in_their_theme_week(store):
+    warmup.warm("key", "Fantasy Realms", ROLLOVER, store, budget=10 ** 9)
+    tool_id, _, prompt = warmup.plan("Fantasy Realms")[0]
+    fantasy_week = datetime.date(2024, 3, 27)
+    assert store.get(tool_id, prompt, today=fantasy_week)
+    assert store.get(tool_id, prompt, today=fantasy_week + datetime.timedelta(days=7)) is None
+
+
+def test_warmed_results_expire(tmp_path):
+    store = warmup.WarmStore(str(tmp_path / "warmup.db"), max_age_days=0)
+    theme = catalog.weekly_theme(datetime.date.today())
+    store.put("eli5", "prompt", theme, "result", 10)
+    assert store.get("eli5", "prompt") is None
+
+
+def test_the_scheduler_never_falls_back_to_the_server_key(monkeypatch):
+    monkeypatch.delenv("WARMUP_API_KEY", raising=False)
+    monkeypatch.setenv("GEMINI_API_KEY", "server-key")
+    try:
+        assert importlib.reload(warmup).WARMUP_API_KEY is None
+    finally:
+        monkeypatch.undo()
+        importlib.reload(warmup)
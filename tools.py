@@ -0,0 +1,459 @@
+import collections
+import hashlib
+import io
+import os
+import string
+import threading
+import time
+
+import google.generativeai as genai
+from gtts import gTTS
+from PIL import Image
+
+import metrics
+
+MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+# "fake" swaps in the offline stand-ins from fake_gemini for tests and benchmarks.
+GEMINI_BACKEND = os.environ.get("GEMINI_BACKEND", "gemini")
+TTS_BACKEND = os.environ.get("TTS_BACKEND", "gtts")
+TOOL_CACHE_SIZE = int(os.environ.get("TOOL_CACHE_SIZE", "512"))
+TOOL_CACHE_TTL_SECONDS = int(os.environ.get("TOOL_CACHE_TTL_SECONDS", "3600"))
+RATE_LIMIT_PER_MINUTE = int(os.environ.get("RATE_LIMIT_PER_MINUTE", "30"))
+
+# --- Structured Output Schemas ---
+# Tools with a "schema" ask the model for JSON matching it instead of markdown;
+# structured.py parses the result. Schemas can't recurse, so a mind map comes
+# back two levels deep and deeper branches are fetched one node at a time.
+_STRING_LIST = {"type": "ARRAY", "items": {"type": "STRING"}}
+MIND_MAP_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "branches": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {"label": {"type": "STRING"}, "children": _STRING_LIST},
+                "required": ["label", "children"],
+            },
+        },
+    },
+    "required": ["branches"],
+}
+SWOT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {quadrant: _STRING_LIST for quadrant in ("strengths", "weaknesses", "opportunities", "threats")},
+    "required": ["strengths", "weaknesses", "opportunities", "threats"],
+}
+POINTS_SCHEMA = {"type": "OBJECT", "properties": {"points": _STRING_LIST}, "required": ["points"]}
+
+# --- Tool Registry ---
+# Every text tool in the app, keyed by a stable id. The fields a tool needs are
+# the placeholders in its prompt template, so the UI, the HTTP API and batch
+# runs all build exactly the same request. Tools marked "shared" give
+# reference answers that may be served to every caller from one cache entry;
+# creative tools are cached per API key.
+TOOLS = {
+    "feedback": {
+        "label": "🌟 Share Your Creation",
+        "prompt": "Provide feedback on this creative work: {work}",
+    },
+    "personalized_prompt": {
+        "label": "✨ Get a Personalized Prompt",
+        "prompt": "Generate a creative prompt about: {topic}",
+    },
+    "mind_map": {
+        "label": "🧠 Mind Map Generator",
+        "prompt": "Generate a mind map for the topic: {topic}. Give 4-6 main branches, each with 2-4 short sub-branches.",
+        "schema": MIND_MAP_SCHEMA,
+        "shared": True,
+    },
+    "mind_map_expand": {
+        "label": "🧠 Mind Map Branch",
+        "prompt": "In a mind map about {topic}, list 3-5 short sub-branches for the branch: {path}",
+        "schema": POINTS_SCHEMA,
+        "shared": True,
+    },
+    "swot": {
+        "label": "📊 SWOT Analysis Generator",
+        "prompt": "Generate a SWOT analysis (Strengths, Weaknesses, Opportunities, Threats) for: {subject}. Give 3-5 concise points per quadrant.",
+        "schema": SWOT_SCHEMA,
+        "shared": True,
+    },
+    "swot_expand": {
+        "label": "📊 SWOT Quadrant",
+        "prompt": "For a SWOT analysis of {subject}, give 3 more concise {quadrant}, different from: {existing}",
+        "schema": POINTS_SCHEMA,
+        "shared": True,
+    },
+    "code_docs": {
+        "label": "📄 Code Documentation Writer",
+        "prompt": "Generate documentation for the following {language} code: \n```\n{code}\n```",
+        "shared": True,
+    },
+    "character_interview": {
+        "label": "🎤 Fictional Character Interviewer",
+        "prompt": "I am interviewing a fictional character. You are this character: '{character}'. I will ask you questions. Respond as the character would. My first question is: {question}",
+    },
+    "dream_interpreter": {
+        "label": "🌙 Dream Interpreter",
+        "prompt": "Provide a psychological and symbolic interpretation of the following dream: {dream}",
+    },
+    "ethical_dilemma": {
+        "label": "⚖️ Ethical Dilemma Solver",
+        "prompt": "Analyze the following ethical dilemma from utilitarian, deontological, and virtue ethics perspectives: {dilemma}",
+    },
+    "meal_plan": {
+        "label": "🥗 Meal Plan Generator",
+        "prompt": "Create a {days}-day meal plan (breakfast, lunch, dinner) with the following dietary needs: {diet}. Include a grocery list.",
+    },
+    "fitness_challenge": {
+        "label": "💪 Personalized Fitness Challenge Creator",
+        "prompt": "Create a {days}-day personalized fitness challenge for the goal: {goal}. The challenge should be progressive.",
+    },
+    "social_posts": {
+        "label": "📱 Social Media Post Crafter",
+        "prompt": "Craft social media posts about '{topic}' tailored for the following platforms: {platforms}. Include relevant hashtags.",
+    },
+    "lesson_plan": {
+        "label": "👨‍🏫 Lesson Plan Creator",
+        "prompt": "Create a detailed lesson plan for a {grade} class on the topic of '{topic}' in the subject of {subject}. Include objectives, activities, and assessment methods.",
+    },
+    "gamer_tags": {
+        "label": "🎮 Gamer Tag Generator",
+        "prompt": "Generate 10 unique and cool gamer tags with the theme: {theme}",
+    },
+    "fictional_language": {
+        "label": "🗣️ Fictional Language Creator",
+        "prompt": "Based on the concept '{concept}', create a basic vocabulary of 20 words and simple grammatical rules for a new fictional language.",
+    },
+    "cover_letter": {
+        "label": "✉️ Cover Letter Writer",
+        "prompt": "Write a professional cover letter based on this job description: '{job_description}' and this user's information: '{user_info}'.",
+    },
+    "product_description": {
+        "label": "📦 Product Description Generator",
+        "prompt": "Write a compelling e-commerce product description for '{name}' with the following features: {features}.",
+    },
+    "meditation_script": {
+        "label": "🧘 Meditation Script Writer",
+        "prompt": "Write a guided meditation script for a {minutes}-minute session focused on {focus}.",
+    },
+    "historical_dialogue": {
+        "label": "🏛️ Historical Figure Dialogue",
+        "prompt": "Write a short, imagined dialogue between {figure1} and {figure2} about {topic}. Capture their likely perspectives and personalities.",
+    },
+    "eli5": {
+        "label": "👶 ELI5 (Explain Like I'm 5) Generator",
+        "prompt": "Explain the following topic like I'm 5 years old: {topic}",
+        "shared": True,
+    },
+    "debate_topic": {
+        "label": "⚔️ Debate Topic Generator",
+        "prompt": "Generate a controversial debate topic related to {subject}. Provide a brief for both the 'pro' and 'con' sides.",
+    },
+    "critique": {
+        "label": "🔬 Advanced AI Critiques",
+        "prompt": "Provide a {critique_type} for the following: {text}",
+    },
+    "idea_expander": {
+        "label": "💡 Idea Expander",
+        "prompt": "Expand this idea into a detailed concept with world-building notes: {idea}",
+    },
+    "style_transfer": {
+        "label": "✍️ Style Transfer",
+        "prompt": "Rewrite the following text in the style of {author}: {text}",
+    },
+    "code_refactoring": {
+        "label": "💻 Code Refactoring Suggestions",
+        "prompt": "Provide code refactoring suggestions for the following code: {code}",
+    },
+    "ambiance": {
+        "label": "🎵 Music/Ambiance Suggester",
+        "prompt": "Suggest music or ambiance for the following scene: {scene}",
+    },
+    "title_generator": {
+        "label": "🏷️ Title Generator",
+        "prompt": "Generate 5 catchy titles for the following work: {text}",
+    },
+    "character_dialogue": {
+        "label": "💬 Character Dialogue Generator",
+        "prompt": "Write a short dialogue between {character1} and {character2} in this situation: {situation}",
+    },
+    "plot_twist": {
+        "label": "💥 Plot Twist Generator",
+        "prompt": "Generate a surprising plot twist for this story: {plot}",
+    },
+    "visual_palette": {
+        "label": "🎨 Visual Palette Generator",
+        "prompt": "Generate a color palette (with hex codes) for this theme: {theme}",
+    },
+    "world_anvil": {
+        "label": "🌍 World Anvil",
+        "prompt": "Expand this world concept with details on its history, cultures, and key locations: {concept}",
+    },
+    "character_backstory": {
+        "label": "👤 Character Backstory Generator",
+        "prompt": "Write a detailed backstory for this character: {concept}",
+    },
+    "poetry": {
+        "label": "📜 Poetry Assistant",
+        "prompt": "Write a {poem_type} about {topic}",
+    },
+    "scriptwriting": {
+        "label": "🎬 Scriptwriting Assistant",
+        "prompt": "Write a script scene based on this description: {scene}",
+    },
+    "blog_ideas": {
+        "label": "📝 Blog Post Idea Generator",
+        "prompt": "Generate 5 blog post ideas for a blog about {topic}",
+    },
+    "speech": {
+        "label": "🗣️ Speech Writer",
+        "prompt": "Write a short, {tone} speech about {topic}",
+    },
+    "interview_questions": {
+        "label": "❓ Interview Question Generator",
+        "prompt": "Generate 5 interview questions for a {job_role} position.",
+    },
+    "email_responder": {
+        "label": "📧 Email Responder",
+        "prompt": "Draft an email response to the following email, with the goal of {goal}: {email}",
+    },
+    "analogy": {
+        "label": "🤔 Analogy Generator",
+        "prompt": "Generate an analogy to explain this concept: {concept}",
+    },
+    "brainstorm": {
+        "label": "💡 Brainstorming Partner",
+        "prompt": "Let's brainstorm about {topic}. Here are some initial ideas:",
+    },
+    "book_summary": {
+        "label": "📚 Book Summary Generator",
+        "prompt": "Provide a concise summary of the book: {title}",
+        "shared": True,
+    },
+    "translator": {
+        "label": "🌐 Language Translator",
+        "prompt": "Translate the following text to {language}: {text}",
+        "shared": True,
+    },
+    "article_summary": {
+        "label": "📰 News Article Summarizer",
+        "prompt": "Summarize the news article at this URL: {url}",
+        "shared": True,
+    },
+    "recipe": {
+        "label": "🍔 Recipe Generator",
+        "prompt": "Generate a recipe using these ingredients: {ingredients}",
+    },
+    "workout_plan": {
+        "label": "🏋️ Workout Plan Generator",
+        "prompt": "Create a {days_per_week}-day workout plan for someone whose goal is to {goal}.",
+    },
+    "travel_itinerary": {
+        "label": "✈️ Travel Itinerary Planner",
+        "prompt": "Create a {days}-day travel itinerary for a trip to {destination}.",
+    },
+    "business_names": {
+        "label": "💼 Business Name Generator",
+        "prompt": "Generate 10 creative business names for a company in the {industry} industry.",
+    },
+    "slogans": {
+        "label": "📣 Slogan Generator",
+        "prompt": "Generate 5 catchy slogans for {product}.",
+    },
+    "learning_path": {
+        "label": "🎓 Learning Path Generator",
+        "prompt": "Create a step-by-step learning path for someone who wants to learn {skill}.",
+    },
+    "story_continuation": {
+        "label": "🤝 Collaborative Storytelling",
+        "prompt": "Continue this story: {story}",
+    },
+}
+
+
+class RateLimitError(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Rate limit exceeded; try again in {retry_after:.0f}s.")
+        self.retry_after = retry_after
+
+
+def tool_fields(tool_id):
+    """Names of the fields a tool's prompt template expects, in order."""
+    return [name for _, name, _, _ in string.Formatter().parse(TOOLS[tool_id]["prompt"]) if name]
+
+
+def build_prompt(tool_id, **fields):
+    if tool_id not in TOOLS:
+        raise KeyError(f"Unknown tool: {tool_id}")
+    missing = [name for name in tool_fields(tool_id) if not str(fields.get(name, "")).strip()]
+    if missing:
+        raise ValueError(f"Missing fields for {tool_id}: {', '.join(missing)}")
+    return TOOLS[tool_id]["prompt"].format(**fields)
+
+
+# --- Caching & Rate Limiting ---
+class TTLCache:
+    """Small thread-safe LRU whose entries also expire after a fixed age."""
+
+    def __init__(self, maxsize=TOOL_CACHE_SIZE, ttl=TOOL_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RateLimiter:
+    """Per-key token bucket refilled at `per_minute` tokens per minute."""
+
+    def __init__(self, per_minute=RATE_LIMIT_PER_MINUTE):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                raise RateLimitError((1 - tokens) / self.rate)
+            self._buckets[key] = (tokens - 1, now)
+
+
+cache = TTLCache()
+rate_limiter = RateLimiter()
+# Results generated ahead of time (see warmup.py): anything with get(tool_id, prompt).
+prewarmed = None
+
+
+# --- Model Calls ---
+_fake_model = None
+
+
+def get_model(api_key):
+    global _fake_model
+    if GEMINI_BACKEND == "fake":
+        import fake_gemini
+        if _fake_model is None:
+            _fake_model = fake_gemini.FakeGenerativeModel(MODEL_NAME)
+        return _fake_model
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(MODEL_NAME)
+
+
+# Extra callbacks (e.g. the profiler) run after every external call, after the
+# metrics are recorded, as callback(kind, name, elapsed_seconds, error), where
+# kind is "model" or "tts" and error is None on success.
+_observers = []
+
+
+def add_observer(callback):
+    if callback not in _observers:
+        _observers.append(callback)
+
+
+def _notify(kind, name, started, error):
+    elapsed = time.perf_counter() - started
+    metrics.record_call(kind, name, elapsed, error, model=MODEL_NAME)
+    for callback in _observers:
+        callback(kind, name, elapsed, error)
+
+
+def generate(api_key, contents, tool=None, schema=None):
+    """Send `contents` (a prompt string or a list of parts) to Gemini and return the text.
+
+    With a `schema` the model is constrained to JSON matching it.
+    """
+    started, error = time.perf_counter(), None
+    config = {"response_mime_type": "application/json", "response_schema": schema} if schema else None
+    try:
+        return get_model(api_key).generate_content(contents, generation_config=config).text
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _notify("model", tool, started, error)
+
+
+def synthesize_speech(text, lang="en"):
+    """Return an in-memory MP3 of `text` read aloud."""
+    started, error = time.perf_counter(), None
+    try:
+        if TTS_BACKEND == "fake":
+            import fake_gemini
+            tts = fake_gemini.FakeTTS(text, lang=lang)
+        else:
+            tts = gTTS(text, lang=lang)
+        fp = io.BytesIO()
+        tts.write_to_fp(fp)
+        fp.seek(0)
+        return fp
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _notify("tts", lang, started, error)
+
+
+def _cache_key(api_key, tool_id, prompt, images):
+    owner = "" if TOOLS[tool_id].get("shared") else hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+    return (tool_id, owner, prompt) + tuple(hashlib.sha256(image).hexdigest() for image in images)
+
+
+def run_tool(api_key, tool_id, images=(), fresh=False, **fields):
+    """Run a registered tool, serving repeated requests from the cache.
+
+    Shared tools are cached for every caller; other tools only for the same
+    API key, so a made-up key never reads a result someone else paid for.
+    `images` are raw image bytes sent after the prompt; their digests are
+    part of the cache key. Results pre-generated by the warm-up scheduler are
+    served the same way. `fresh` skips both and asks the model again, for a
+    user who wants a different answer. Only model calls count against the
+    caller's rate limit.
+    """
+    prompt = build_prompt(tool_id, **fields)
+    key = _cache_key(api_key, tool_id, prompt, images)
+    if not fresh:
+        cached = cache.get(key)
+        if cached is not None:
+            metrics.tool_cache_total.inc(tool=tool_id, result="hit")
+            return cached
+        if prewarmed is not None and not images:
+            cached = prewarmed.get(tool_id, prompt)
+            if cached is not None:
+                metrics.tool_cache_total.inc(tool=tool_id, result="warm")
+                cache.put(key, cached)
+                return cached
+    metrics.tool_cache_total.inc(tool=tool_id, result="miss")
+    rate_limiter.acquire(api_key)
+    contents = [prompt] + [Image.open(io.BytesIO(image)) for image in images] if images else prompt
+    text = generate(api_key, contents, tool=tool_id, schema=TOOLS[tool_id].get("schema"))
+    cache.put(key, text)
+    return text
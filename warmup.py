@@ -0,0 +1,213 @@
+import argparse
+import datetime
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+import catalog
+import tools
+
+WARMUP_DB = os.environ.get("WARMUP_DB", "warmup.db")
+# Only an explicit WARMUP_API_KEY lets app processes spend a key in the
+# background; GEMINI_API_KEY is for commands an operator runs by hand.
+WARMUP_API_KEY = os.environ.get("WARMUP_API_KEY")
+# Local hours (start-end, end exclusive) in which background warm-up may run.
+WARMUP_HOURS = os.environ.get("WARMUP_HOURS", "2-5")
+WARMUP_LEAD_DAYS = int(os.environ.get("WARMUP_LEAD_DAYS", "2"))
+WARMUP_TOKEN_BUDGET = int(os.environ.get("WARMUP_TOKEN_BUDGET", "20000"))
+WARMUP_MAX_AGE_DAYS = int(os.environ.get("WARMUP_MAX_AGE_DAYS", "21"))
+WARMUP_CHECK_SECONDS = int(os.environ.get("WARMUP_CHECK_SECONDS", "900"))
+
+WARMUP_TOOLS = ("personalized_prompt", "idea_expander", "world_anvil")
+
+
+# --- Warm Store ---
+class WarmStore:
+    """Pre-generated tool results keyed by the exact prompt they answer.
+
+    Shared by every process pointed at the same file; tools.run_tool falls back
+    to it on a cache miss once it is installed as tools.prewarmed. Results are
+    only served during their theme's week and while younger than `max_age_days`.
+    """
+
+    def __init__(self, path=WARMUP_DB, max_age_days=WARMUP_MAX_AGE_DAYS):
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS warm ("
+            "tool TEXT NOT NULL, prompt TEXT NOT NULL, theme TEXT NOT NULL, result TEXT NOT NULL, "
+            "tokens INTEGER NOT NULL, created_at REAL NOT NULL, PRIMARY KEY (tool, prompt));"
+            "CREATE TABLE IF NOT EXISTS spend ("
+            "theme TEXT NOT NULL, rollover TEXT NOT NULL, tokens INTEGER NOT NULL, PRIMARY KEY (theme, rollover));"
+        )
+
+    def get(self, tool, prompt, today=None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, theme, created_at FROM warm WHERE tool = ? AND prompt = ?", (tool, prompt)
+            ).fetchone()
+        if row is None:
+            return None
+        result, theme, created_at = row
+        if theme != catalog.weekly_theme(today or datetime.date.today()) or time.time() - created_at >= self.max_age:
+            return None
+        return result
+
+    def is_fresh(self, tool, prompt, max_age):
+        with self._lock:
+            row = self._conn.execute("SELECT created_at FROM warm WHERE tool = ? AND prompt = ?", (tool, prompt)).fetchone()
+        return row is not None and time.time() - row[0] < max_age
+
+    def put(self, tool, prompt, theme, result, tokens):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO warm (tool, prompt, theme, result, tokens, created_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(tool, prompt) DO UPDATE SET theme = excluded.theme, result = excluded.result, "
+                "tokens = excluded.tokens, created_at = excluded.created_at",
+                (tool, prompt, theme, result, tokens, time.time()),
+            )
+
+    def spent(self, theme, rollover):
+        """Tokens already charged to warming `theme` for the rollover on `rollover` (a date)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tokens FROM spend WHERE theme = ? AND rollover = ?", (theme, rollover.isoformat())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def charge(self, theme, rollover, tokens):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO spend (theme, rollover, tokens) VALUES (?, ?, ?) "
+                "ON CONFLICT(theme, rollover) DO UPDATE SET tokens = tokens + excluded.tokens",
+                (theme, rollover.isoformat(), tokens),
+            )
+
+
+# --- Planning ---
+def next_rollover(today):
+    """The Monday on which the next weekly theme takes over."""
+    return today + datetime.timedelta(days=7 - today.weekday())
+
+
+def plan(theme):
+    """(tool_id, fields, prompt) jobs for `theme`, interleaving tools so every pre-filled input comes first."""
+    seeds = catalog.theme_seeds(theme)
+    jobs = []
+    for row in itertools.zip_longest(*(seeds[tool_id] for tool_id in WARMUP_TOOLS)):
+        for tool_id, fields in zip(WARMUP_TOOLS, row):
+            if fields is not None:
+                jobs.append((tool_id, fields, tools.build_prompt(tool_id, **fields)))
+    return jobs
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text; close enough for a budget.
+    return max(1, len(text) // 4)
+
+
+def warm(api_key, theme, rollover, store, budget=WARMUP_TOKEN_BUDGET, max_age_days=WARMUP_MAX_AGE_DAYS, log=None):
+    """Generate missing or stale content for `theme` ahead of the `rollover` date.
+
+    `budget` covers every run for the same theme and rollover, whichever
+    process makes it: tokens are charged in the store, failed calls included,
+    so repeated scheduler ticks cannot spend it again. Returns counts of
+    generated, skipped (already fresh) and failed jobs, and the tokens this
+    run used.
+    """
+    summary = {"generated": 0, "skipped": 0, "failed": 0, "tokens": 0}
+    for tool_id, fields, prompt in plan(theme):
+        if store.is_fresh(tool_id, prompt, max_age_days * 86400):
+            summary["skipped"] += 1
+            continue
+        if store.spent(theme, rollover) >= budget:
+            break
+        try:
+            result = tools.generate(api_key, prompt, tool=tool_id)
+        except Exception as e:
+            tokens = estimate_tokens(prompt)
+            store.charge(theme, rollover, tokens)
+            summary["failed"] += 1
+            summary["tokens"] += tokens
+            if log:
+                log(f"{tool_id} {fields}: {e}")
+            continue
+        tokens = estimate_tokens(prompt) + estimate_tokens(result)
+        store.put(tool_id, prompt, theme, result, tokens)
+        store.charge(theme, rollover, tokens)
+        summary["generated"] += 1
+        summary["tokens"] += tokens
+    return summary
+
+
+# --- Scheduling ---
+def _parse_hours(spec):
+    start, _, end = spec.partition("-")
+    return int(start), int(end or int(start) + 1)
+
+
+def is_due(now, hours=WARMUP_HOURS, lead_days=WARMUP_LEAD_DAYS):
+    """Whether `now` is off-peak and within `lead_days` of the next theme rollover."""
+    start, end = _parse_hours(hours)
+    off_peak = start <= now.hour < end if start <= end else (now.hour >= start or now.hour < end)
+    return off_peak and (next_rollover(now.date()) - now.date()).days <= lead_days
+
+
+def _run_scheduler(api_key, store):
+    while True:
+        time.sleep(WARMUP_CHECK_SECONDS)
+        now = datetime.datetime.now()
+        if is_due(now):
+            rollover = next_rollover(now.date())
+            warm(api_key, catalog.weekly_theme(rollover), rollover, store)
+
+
+def start_background(api_key=WARMUP_API_KEY, store=None):
+    """Install the warm store for tools.run_tool and, given a key, start the off-peak scheduler.
+
+    Returns the store. Without an API key nothing is generated here, but
+    content warmed by `python warmup.py run` elsewhere is still served.
+    """
+    store = store or WarmStore()
+    tools.prewarmed = store
+    if api_key:
+        threading.Thread(target=_run_scheduler, args=(api_key, store), name="theme-warmup", daemon=True).start()
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate content for the upcoming weekly theme.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("plan", "run"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--date", type=datetime.date.fromisoformat, default=datetime.date.today(),
+                         help="Warm the theme that starts after this date (default: today)")
+        cmd.add_argument("--theme", help="Warm this theme instead of the upcoming one")
+    run = sub.choices["run"]
+    run.add_argument("--budget", type=int, default=WARMUP_TOKEN_BUDGET,
+                     help="Approximate token budget for the rollover, shared by every run")
+    run.add_argument("--max-age-days", type=int, default=WARMUP_MAX_AGE_DAYS, help="Regenerate content older than this")
+    args = parser.parse_args(argv)
+
+    rollover = next_rollover(args.date)
+    theme = args.theme or catalog.weekly_theme(rollover)
+    if args.command == "plan":
+        for tool_id, fields, _ in plan(theme):
+            print(f"{theme}\t{tool_id}\t{fields}")
+        return
+    api_key = WARMUP_API_KEY or os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        parser.error("Set WARMUP_API_KEY or GEMINI_API_KEY.")
+    store = WarmStore(max_age_days=args.max_age_days)
+    summary = warm(api_key, theme, rollover, store, args.budget, args.max_age_days, log=print)
+    print(f"{theme}: {summary['generated']} generated, {summary['skipped']} already fresh, "
+          f"{summary['failed']} failed, ~{summary['tokens']} tokens "
+          f"(~{store.spent(theme, rollover)} of {args.budget} spent for {rollover})")
+
+
+if __name__ == "__main__":
+    main()